@@ -0,0 +1,86 @@
+# Games per second of BatchGame against the ClassicGame object engine.
+#
+#   python -m benchmarks.batch_throughput [--games N] [--object-games N]
+#                                         [--runs N] [--min-speedup X]
+#
+# Both engines play random fleets with every player shooting a random
+# permutation of the board until the game is over, on one core. The batch
+# engine runs all its games in one BatchGame, the object engine plays its
+# games one at a time through fire_cell(). The engines take turns for
+# --runs runs so they see the same machine load, and the best run of each
+# is reported. With --min-speedup the run fails (exit status 1) when the
+# batch engine is less than that many times faster than any object backend.
+import argparse
+import random
+import sys
+import time
+
+import numpy
+
+from pyships.batchgame import BatchGame
+from pyships.battleship import BACKENDS, ClassicGame
+from pyships.board import CELLS, COLUMNS, ROWS
+from pyships.fleetgen import generate_fleet, generate_layout_array
+
+def batch_games_per_second(games: int, seed: int) -> float:
+    ships = generate_layout_array(2 * games, seed=seed).reshape(games, 2, ROWS, COLUMNS)
+    rng = numpy.random.default_rng(seed)
+    # (player, shot, game) uint8 cells, so every step reads one small
+    # contiguous row
+    orders = numpy.ascontiguousarray(numpy.argsort(rng.random((games, 2, CELLS)), axis=2).transpose(1, 2, 0),
+                                  dtype=numpy.uint8)
+
+    batch = BatchGame(ships)
+    start = time.perf_counter()
+    # Every shot of a permutation is valid, so all running games are on the
+    # same turn: step s is player s % 2 firing its (s // 2)-th shot
+    step = 0
+    while not batch.is_over.all():
+        batch.take_cell_shots(orders[step % 2, step // 2])
+        step += 1
+    return games / (time.perf_counter() - start)
+
+def object_games_per_second(games: int, seed: int, backend: str) -> float:
+    rng = random.Random(seed)
+    played = [(ClassicGame(generate_fleet(rng.getrandbits(32), 'Player1', backend),
+                           generate_fleet(rng.getrandbits(32), 'Player2', backend)),
+               [rng.sample(range(CELLS), CELLS) for _ in range(2)])
+              for _ in range(games)]
+
+    start = time.perf_counter()
+    for game, orders in played:
+        turn = 0
+        while not game.is_over:
+            game.fire_cell(orders[turn % 2][turn // 2])
+            turn += 1
+    return games / (time.perf_counter() - start)
+
+def main(argv: [str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Games per second of BatchGame against ClassicGame')
+    parser.add_argument('--games', type=int, default=10000, help='games in the batch')
+    parser.add_argument('--object-games', type=int, default=500, help='games per object backend')
+    parser.add_argument('--runs', type=int, default=9, help='runs per engine, the best is reported')
+    parser.add_argument('--min-speedup', type=float, help='fail when below this speedup over any backend')
+    args = parser.parse_args(argv)
+
+    batch = 0
+    games = dict.fromkeys(BACKENDS, 0)
+    for seed in range(args.runs):
+        batch = max(batch, batch_games_per_second(args.games, seed))
+        for backend in BACKENDS:
+            games[backend] = max(games[backend], object_games_per_second(args.object_games, seed, backend))
+    print('{:<10} {:>12,.0f} games/s'.format('batch', batch))
+
+    failed = False
+    for backend in BACKENDS:
+        speedup = batch / games[backend]
+        marker = ''
+        if args.min_speedup is not None and speedup < args.min_speedup:
+            failed = True
+            marker = '  BELOW {:g}x'.format(args.min_speedup)
+        print('{:<10} {:>12,.0f} games/s  batch is {:.0f}x{}'.format(backend, games[backend], speedup, marker))
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
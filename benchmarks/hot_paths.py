@@ -0,0 +1,302 @@
+# Throughput and latency percentiles of the engine and rendering hot paths.
+#
+#   python -m benchmarks.hot_paths [--samples N] [--only NAME ...]
+#                                  [--out results.json]
+#                                  [--baseline baseline.json] [--threshold 0.10]
+#
+# Every benchmark is timed as a number of samples, each a batch of
+# operations (one placement, one shot, one render, ...). Percentiles are of
+# the per-operation time in each sample. With --baseline the p50 of every
+# benchmark is compared with the stored one and the run fails (exit status
+# 1) when any is slower by more than --threshold.
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from pyships.battleship import BACKENDS, ClassicGame, _place_ship_parts
+from pyships.board import CELLS, CELL_LOCATIONS, CLASSIC_BOARD
+from pyships.fleetgen import generate_fleet, layout_locations, random_layout
+from pyships.ships import FLEET
+
+def _fleet_cells(rng: random.Random) -> [(int, int, 'type')]:
+    # (start cell, end cell, ship type) of a random layout
+    return [(CLASSIC_BOARD.cell_index(start), CLASSIC_BOARD.cell_index(end), ship_type)
+            for ship_type, (start, end) in zip(FLEET, layout_locations(random_layout(rng)))]
+
+def _played_game(rng: random.Random, backend: str, shots: int) -> ClassicGame:
+    game = ClassicGame(generate_fleet(rng.getrandbits(32), 'Player1', backend),
+                       generate_fleet(rng.getrandbits(32), 'Player2', backend))
+    orders = [rng.sample(range(CELLS), CELLS) for _ in range(2)]
+    for turn in range(shots):
+        if game.is_over:
+            break
+        game.take_shot_cell(orders[turn % 2][turn // 2])
+    return game
+
+def bench_place_ship_parts(rng: random.Random, samples: int) -> ['callable']:
+    def run(fleet=_fleet_cells(rng)) -> int:
+        holes = [None] * CELLS
+        for start, end, ship_type in fleet:
+            _place_ship_parts(start, end, holes, ship_type())
+        return len(fleet)
+    return [run] * samples
+
+def bench_place(backend: str) -> 'callable':
+    ocean_grid_type = BACKENDS[backend][0]
+
+    def make(rng: random.Random, samples: int) -> ['callable']:
+        def run(fleet=[(CELL_LOCATIONS[start], CELL_LOCATIONS[end], ship_type)
+                       for start, end, ship_type in _fleet_cells(rng)]) -> int:
+            grid = ocean_grid_type()
+            for start, end, ship_type in fleet:
+                grid.place(start, end, ship_type())
+            return len(fleet)
+        return [run] * samples
+    return make
+
+def bench_shoot(backend: str) -> 'callable':
+    def make(rng: random.Random, samples: int) -> ['callable']:
+        # A fresh fleet for every sample, shot at every cell
+        runs = []
+        for _ in range(samples):
+            grid = generate_fleet(rng.getrandbits(32), backend=backend).ocean_grid
+            order = rng.sample(CELL_LOCATIONS, CELLS)
+
+            def run(grid=grid, order=order) -> int:
+                for location in order:
+                    grid.shoot(location)
+                return len(order)
+            runs.append(run)
+        return runs
+    return make
+
+def bench_at(backend: str) -> 'callable':
+    def make(rng: random.Random, samples: int) -> ['callable']:
+        grid = generate_fleet(rng.getrandbits(32), backend=backend).ocean_grid
+
+        def run() -> int:
+            for location in CELL_LOCATIONS:
+                grid.at(location)
+            return CELLS
+        return [run] * samples
+    return make
+
+def bench_take_shot(backend: str) -> 'callable':
+    def make(rng: random.Random, samples: int) -> ['callable']:
+        # One full random game per sample
+        runs = []
+        for _ in range(samples):
+            game = ClassicGame(generate_fleet(rng.getrandbits(32), 'Player1', backend),
+                               generate_fleet(rng.getrandbits(32), 'Player2', backend))
+            orders = [rng.sample(CELL_LOCATIONS, CELLS) for _ in range(2)]
+
+            def run(game=game, orders=orders) -> int:
+                turn = 0
+                while not game.is_over:
+                    game.take_shot(orders[turn % 2][turn // 2])
+                    turn += 1
+                return turn
+            runs.append(run)
+        return runs
+    return make
+
+def bench_str(backend: str, grid: str) -> 'callable':
+    def make(rng: random.Random, samples: int) -> ['callable']:
+        player = _played_game(rng, backend, 80)._player1
+        rendered = getattr(player, grid)
+
+        def run() -> int:
+            str(rendered)
+            return 1
+        return [run] * samples
+    return make
+
+def bench_board_text(backend: str) -> 'callable':
+    from pyships.textrender import BoardText
+
+    def make(rng: random.Random, samples: int) -> ['callable']:
+        # One fleet shot at every cell per sample, its cached text refreshed
+        # after each shot
+        runs = []
+        for _ in range(samples):
+            grid = generate_fleet(rng.getrandbits(32), backend=backend).ocean_grid
+            text = BoardText(grid)
+            order = rng.sample(range(CELLS), CELLS)
+
+            def run(grid=grid, text=text, order=order) -> int:
+                for cell in order:
+                    grid.receive_shot_cell(cell)
+                    text.text()
+                return len(order)
+            runs.append(run)
+        return runs
+    return make
+
+class _HeadlessCanvas:
+    # Item calls of a canvas, counted instead of drawn, so the Python side of
+    # the canvas redraw code can be timed without a display
+    def __init__(self):
+        self.items = 0
+        self.calls = 0
+
+    def create(self, *args, **kwargs) -> int:
+        self.calls += 1
+        self.items += 1
+        return self.items
+
+    def call(self, *args, **kwargs) -> None:
+        self.calls += 1
+
+def _headless(canvas_type: type, **attributes) -> 'GameCanvas':
+    # A canvas_type instance without a Tk window behind it
+    canvas = canvas_type.__new__(canvas_type)
+    recorder = _HeadlessCanvas()
+    for name in ('create_oval', 'create_image', 'create_text', 'create_rectangle'):
+        setattr(canvas, name, recorder.create)
+    for name in ('delete', 'coords', 'itemconfigure', 'itemconfig', 'move', 'tag_raise', 'tag_lower'):
+        setattr(canvas, name, recorder.call)
+    for name, value in attributes.items():
+        setattr(canvas, name, value)
+    return canvas
+
+def bench_ocean_canvas_on_hit(rng: random.Random, samples: int) -> ['callable']:
+    from pyships.oceangridcanvas import OceanGridCanvas
+    from pyships.pegsprite import PegSprite
+
+    # One fleet shot at every cell per sample, the canvas updated after each shot
+    runs = []
+    for _ in range(samples):
+        player = generate_fleet(rng.getrandbits(32))
+        canvas = _headless(OceanGridCanvas, _player=player, _width=765, _height=650,
+                           _rendered_hits=0, _rendered_misses=0,
+                           _pegs=[[PegSprite() for _ in range(CLASSIC_BOARD.columns)]
+                                  for _ in range(CLASSIC_BOARD.rows)])
+        order = rng.sample(range(CELLS), CELLS)
+
+        def run(grid=player.ocean_grid, canvas=canvas, order=order) -> int:
+            for cell in order:
+                grid.receive_shot_cell(cell)
+                canvas.on_hit()
+            return len(order)
+        runs.append(run)
+    return runs
+
+def bench_target_canvas_redraw(rng: random.Random, samples: int) -> ['callable']:
+    from pyships.targetgridcanvas import TargetGridCanvas
+    from pyships.pegsprite import PegSprite
+
+    canvas = _headless(TargetGridCanvas, _player=_played_game(rng, 'list', 80)._player1,
+                       _width=765, _height=650, _target_grid_id=None, _target_grid_photo=None,
+                       _confirm_text_id=None, _has_clicked=False, _shot_attempt_peg=None,
+                       _ATTEMPTED_SHOT_COLOR='green', _sunk_ships=[], _sunk_ship_ids=dict(),
+                       _pegs=[[PegSprite() for _ in range(CLASSIC_BOARD.columns)]
+                              for _ in range(CLASSIC_BOARD.rows)])
+    canvas._build_scene()
+
+    def run() -> int:
+        canvas._redraw()
+        return 1
+    return [run] * samples
+
+BENCHMARKS = {'place_ship_parts': bench_place_ship_parts}
+for _backend in BACKENDS:
+    BENCHMARKS['ocean_place[{}]'.format(_backend)] = bench_place(_backend)
+    BENCHMARKS['ocean_shoot[{}]'.format(_backend)] = bench_shoot(_backend)
+    BENCHMARKS['ocean_at[{}]'.format(_backend)] = bench_at(_backend)
+    BENCHMARKS['take_shot_game[{}]'.format(_backend)] = bench_take_shot(_backend)
+    BENCHMARKS['ocean_str[{}]'.format(_backend)] = bench_str(_backend, 'ocean_grid')
+    BENCHMARKS['target_str[{}]'.format(_backend)] = bench_str(_backend, 'target_grid')
+    BENCHMARKS['board_text[{}]'.format(_backend)] = bench_board_text(_backend)
+BENCHMARKS['ocean_canvas_on_hit'] = bench_ocean_canvas_on_hit
+BENCHMARKS['target_canvas_redraw'] = bench_target_canvas_redraw
+
+def _percentile(ordered: [float], fraction: float) -> float:
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_benchmark(make: 'callable', samples: int, seed: int = 0) -> dict:
+    runs = make(random.Random(seed), samples + samples // 10)
+    # A tenth more runs than samples are made. Those extra runs, the last
+    # ones, warm up caches and are not recorded, so the timed runs are the
+    # same first `samples` whatever the warm-up.
+    for run in runs[samples:]:
+        run()
+
+    per_op = []
+    total_ops = 0
+    total_time = 0
+    clock = time.perf_counter_ns
+    for run in runs[:samples]:
+        start = clock()
+        ops = run()
+        elapsed = clock() - start
+        total_ops += ops
+        total_time += elapsed
+        per_op.append(elapsed / ops)
+
+    per_op.sort()
+    return {'samples': samples,
+            'ops': total_ops,
+            'ops_per_second': total_ops / (total_time / 1e9),
+            'p50_ns': _percentile(per_op, 0.50),
+            'p90_ns': _percentile(per_op, 0.90),
+            'p99_ns': _percentile(per_op, 0.99),
+            'max_ns': per_op[-1]}
+
+def compare(results: dict, baseline: dict, threshold: float) -> [str]:
+    # Names of the benchmarks whose p50 regressed past the threshold
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['p50_ns'] / baseline[name]['p50_ns']
+        marker = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            marker = '  REGRESSION'
+        print('{:<28} {:>8.2f}x baseline{}'.format(name, ratio, marker))
+    return regressions
+
+def main(argv: [str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of the engine and rendering hot paths')
+    parser.add_argument('--samples', type=int, default=200, help='timed samples per benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*', help='run only benchmarks whose name starts with one of these')
+    parser.add_argument('--out', help='file to save the results to (JSON)')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed p50 slowdown against the baseline, as a fraction')
+    args = parser.parse_args(argv)
+
+    results = dict()
+    for name, make in BENCHMARKS.items():
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        try:
+            results[name] = run_benchmark(make, args.samples, args.seed)
+        except ImportError as e:
+            print('{:<28} skipped ({})'.format(name, e))
+            continue
+        result = results[name]
+        print('{:<28} {:>12.0f} ops/s  p50 {:>9.0f} ns  p90 {:>9.0f} ns  p99 {:>9.0f} ns'.format(
+            name, result['ops_per_second'], result['p50_ns'], result['p90_ns'], result['p99_ns']))
+
+    if args.out:
+        with open(args.out, 'w') as out:
+            json.dump({'python': platform.python_version(), 'results': results}, out, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('{} benchmark(s) regressed by more than {:.0%}'.format(len(regressions), args.threshold))
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
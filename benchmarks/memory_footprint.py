@@ -0,0 +1,51 @@
+# Reports the heap cost of a live ClassicGame per grid backend.
+#
+#   python -m benchmarks.memory_footprint [--games N] [--shots N]
+import argparse
+import gc
+import random
+import tracemalloc
+
+from pyships.battleship import BACKENDS, ClassicGame
+from pyships.board import CELL_LOCATIONS
+from pyships.fleetgen import generate_fleet
+
+def build_games(count: int, shots: int, backend: str, seed: int = 0) -> [ClassicGame]:
+    # Games with random fleets, each played for the given number of shots
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        game = ClassicGame(generate_fleet(rng.getrandbits(32), 'Player1', backend),
+                           generate_fleet(rng.getrandbits(32), 'Player2', backend))
+        orders = [rng.sample(CELL_LOCATIONS, len(CELL_LOCATIONS)) for _ in range(2)]
+        for turn in range(shots):
+            if game.is_over:
+                break
+            game.take_shot(orders[turn % 2][turn // 2])
+        games.append(game)
+
+    return games
+
+def bytes_per_game(count: int, shots: int, backend: str) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = build_games(count, shots, backend)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del games
+    return (after - before) / count
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bytes per live game for each grid backend')
+    parser.add_argument('--games', type=int, default=2000, help='number of live games to build')
+    parser.add_argument('--shots', type=int, default=60, help='shots played in each game')
+    args = parser.parse_args()
+
+    for backend in BACKENDS:
+        print('{:<10} {:>10.0f} bytes/game'.format(backend, bytes_per_game(args.games, args.shots, backend)))
+
+if __name__ == '__main__':
+    main()
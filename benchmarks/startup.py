@@ -0,0 +1,78 @@
+# Cold-import time of the headless and GUI entry points.
+#
+#   python -m benchmarks.startup [--runs N] [--only NAME ...]
+#
+# Every run imports one entry point in a fresh interpreter and reports how
+# long the import took and whether it pulled in the GUI libraries. A
+# headless entry point that imports PIL or tkinter fails the run (exit
+# status 1), since simulation workers may not have them installed.
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# name -> (module, headless)
+ENTRY_POINTS = {
+    'engine': ('pyships.battleship', True),
+    'tournament': ('pyships.tournament', True),
+    'gamelog': ('pyships.gamelog', True),
+    'instrumentation': ('pyships.instrumentation', True),
+    'gui': ('pyships.battleshipgame', False)
+}
+
+GUI_MODULES = ('PIL', 'tkinter')
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'gui': [m for m in {gui!r} if m in sys.modules]}}))
+'''
+
+def _import_once(module: str) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    # -B so the runs leave no bytecode caches behind
+    output = subprocess.run([sys.executable, '-B', '-c', _PROBE.format(module=module, gui=GUI_MODULES)],
+                            env=environment, capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+def cold_import(module: str, runs: int) -> dict:
+    # Median and best import time of module over runs fresh interpreters
+    samples = [_import_once(module) for _ in range(runs)]
+    times = sorted(sample['seconds'] for sample in samples)
+    return {'median_ms': times[len(times) // 2] * 1e3,
+            'min_ms': times[0] * 1e3,
+            'gui_modules': samples[0]['gui']}
+
+def main(argv: [str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Cold-import time of the pyships entry points')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per entry point')
+    parser.add_argument('--only', nargs='*', help='entry points to time (default all)')
+    args = parser.parse_args(argv)
+
+    failed = []
+    for name, (module, headless) in ENTRY_POINTS.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            result = cold_import(module, args.runs)
+        except subprocess.CalledProcessError as e:
+            print('{:<16} skipped ({})'.format(name, e.stderr.strip().splitlines()[-1]))
+            continue
+        marker = ''
+        if headless and result['gui_modules']:
+            failed.append(name)
+            marker = '  IMPORTS GUI'
+        print('{:<16} {:<26} median {:>7.1f} ms  min {:>7.1f} ms  gui: {}{}'.format(
+            name, module, result['median_ms'], result['min_ms'], ', '.join(result['gui_modules']) or '-', marker))
+
+    if failed:
+        print('{} headless entry point(s) import GUI modules'.format(len(failed)))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,29 @@
+import argparse
+import sys
+import time
+
 from pyships.battleship import *
+from pyships.errortypes import HitError, PlacementError
+from pyships.textrender import BoardText
+
+# Scripted games, one per line:
+#
+#   <placements of Player1> | <placements of Player2> | <moves>
+#
+# Placements are start:end pairs for the FLEET in order (Carrier,
+# BattleShip, Destroyer, Submarine, Patrol Boat), moves are the shots of
+# both players taking turns, and every location is written Letter-Number
+# like at the prompts:
+#
+#   A-1:A-5 B-1:B-4 C-1:C-3 D-1:D-3 E-1:E-2 | A-1:E-1 ... | J-10 A-1 ...
+#
+# Blank lines and lines starting with # are skipped. Every game prints one
+# tab separated line: its line number, then the winner and the number of
+# shots taken, or '-' if the moves ran out first, or 'error' and why the
+# game could not be played.
+
+# 'A-1' -> cell index, so a move costs one dict lookup to parse
+LOCATION_CELLS = {'{}-{}'.format(row, col + 1): cell for cell, (row, col) in enumerate(CELL_LOCATIONS)}
 
 def play() -> None:
     player1 = ClassicPlayer(name='Player1')
@@ -10,13 +35,16 @@ def play() -> None:
         _place_ships(players[p])
 
     game = ClassicGame(player1, player2)
+    # Board text is kept between turns and only changed rows are rebuilt
+    boards = {player: (BoardText(player.ocean_grid), BoardText(player.target_grid)) for player in players}
 
     while not game.is_over:
         while True:
+            ocean_text, target_text = boards[game.current_player]
             print('YOUR OCEAN, PLAYER {}'.format(game.current_player.name))
-            print(game.current_player.ocean_grid, end = '\n\n')
+            print(ocean_text.text(), end = '\n\n')
             print('YOUR TARGETS, PLAYER {}'.format(game.current_player.name))
-            print(game.current_player.target_grid, end = '\n\n')
+            print(target_text.text(), end = '\n\n')
             loc = input('Player {}\'s move: '.format(game.current_player.name)).split('-')
             row, col = loc[0], (int(loc[1]) - 1)
             hit_ship = False
@@ -60,7 +88,105 @@ def _place_ships(player) -> None:
                      PatrolBoat())
     print(player.ocean_grid)
 
+class ScriptError(Exception):
+    pass
+
+def _cells(tokens: [str]) -> [int]:
+    try:
+        return [LOCATION_CELLS[token] for token in tokens]
+    except KeyError as e:
+        raise ScriptError('bad location {}'.format(e)) from None
+
+def parse_game(line: str) -> ([[(int, int)]], [int]):
+    # ([(start, end) cells per ship] per player, move cells) of a script line
+    sections = line.upper().split('|')
+    if len(sections) != 3:
+        raise ScriptError('expected 3 sections separated by |, got {}'.format(len(sections)))
+
+    fleets = []
+    for section in sections[:2]:
+        pairs = section.split()
+        if len(pairs) != len(FLEET):
+            raise ScriptError('expected {} placements, got {}'.format(len(FLEET), len(pairs)))
+        fleets.append([tuple(_cells(pair.split(':', 1))) for pair in pairs])
+
+    return fleets, _cells(sections[2].split())
+
+def play_scripted(fleets: [[(int, int)]], moves: [int], backend: str = 'list') -> (ClassicPlayer, int):
+    # Play a parsed game. Returns (winner or None, shots taken).
+    players = []
+    for p, fleet in enumerate(fleets):
+        player = ClassicPlayer(name='Player{}'.format(p+1), backend=backend)
+        for ship_type, cells in zip(FLEET, fleet):
+            if len(cells) != 2:
+                raise ScriptError('placement needs a start and an end')
+            ship = ship_type()
+            player.ocean_grid.place_cell(cells[0], cells[1], ship)
+            player.ships[ship_type.__name__] = ship
+        players.append(player)
+
+    game = ClassicGame(players[0], players[1])
+    fire_cell = game.fire_cell
+    shots = 0
+    for cell in moves:
+        shots += 1
+        if fire_cell(cell).is_game_over:
+            break
+    if shots < len(moves):
+        raise ScriptError('{} moves after the game ended'.format(len(moves) - shots))
+
+    return game.winner, shots
+
+def play_batch(lines: 'iterable of str', out: 'file', backend: str = 'list') -> dict:
+    # Play every scripted game in lines, writing a result line per game
+    totals = {'games': 0, 'Player1': 0, 'Player2': 0, 'unfinished': 0, 'errors': 0}
+    write = out.write
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        totals['games'] += 1
+        try:
+            winner, shots = play_scripted(*parse_game(line), backend)
+        except (ScriptError, PlacementError, BadLocationError, HitError, GameError, TargetError) as e:
+            totals['errors'] += 1
+            write('{}\terror\t{}: {}\n'.format(number, type(e).__name__, e))
+            continue
+        if winner is None:
+            totals['unfinished'] += 1
+            write('{}\t-\t{}\n'.format(number, shots))
+        else:
+            totals[winner.name] += 1
+            write('{}\t{}\t{}\n'.format(number, winner.name, shots))
+    return totals
+
+def main(argv: [str] = None) -> None:
+    parser = argparse.ArgumentParser(description='Console Battleship, interactive or from scripted games')
+    parser.add_argument('scripts', nargs='*', metavar='script',
+                        help='files of scripted games, one per line (- for stdin); interactive if none')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='list')
+    args = parser.parse_args(argv)
+
+    if not args.scripts:
+        play()
+        return
+
+    start = time.perf_counter()
+    totals = dict()
+    for script in args.scripts:
+        if script == '-':
+            results = play_batch(sys.stdin, sys.stdout, args.backend)
+        else:
+            with open(script) as lines:
+                results = play_batch(lines, sys.stdout, args.backend)
+        for key, value in results.items():
+            totals[key] = totals.get(key, 0) + value
+
+    elapsed = time.perf_counter() - start
+    print('{games} games: Player1 {Player1}, Player2 {Player2}, unfinished {unfinished}, errors {errors}'.format(**totals),
+          '({:.0f} games/s)'.format(totals['games'] / elapsed if elapsed else 0), file=sys.stderr)
+
 if __name__=='__main__':
-    play()
+    main()
     
 
@@ -0,0 +1,155 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+
+from PIL import Image
+
+from .battleshipconfig import (
+    ASSET_BUNDLE_DIR,
+    OCEAN_GRID_PATH,
+    TARGET_GRID_PATH,
+    SHIP_PATHS
+    )
+
+# Pre-decoded sprite bundle.
+#
+# build() decodes every sprite once, with each ship in all four rotations,
+# and writes the RGBA pixels back to back into one sheet file
+# (sprites-<hash>.bin) next to a JSON index of (path, angle, width, height,
+# offset) entries. <hash> covers the source GIFs and the bundle layout, so a
+# changed sprite gets a new bundle rather than a stale one.
+#
+# load() memory-maps the sheet and wraps each entry with Image.frombuffer,
+# so nothing is decoded at startup. A bundle that can't be read (a cut off
+# sheet or index, say after a crash) is deleted and built again. Bundles of
+# older sources are deleted after each build. preload_async() does the
+# loading on a worker thread and hands the images to an ImageLoader while
+# the start menu shows.
+
+BUNDLE_VERSION = 1
+RGBA_BYTES = 4
+
+SPRITES = tuple([(OCEAN_GRID_PATH, 0), (TARGET_GRID_PATH, 0)] +
+                [(path, angle) for path in SHIP_PATHS for angle in (0, 90, 180, 270)])
+
+def content_hash(sprites: [(str, int)] = SPRITES) -> str:
+    digest = hashlib.sha256('{}:{}'.format(BUNDLE_VERSION, sprites).encode('utf-8'))
+    for path in sorted({path for path, angle in sprites}):
+        with open(path, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+def _bundle_paths(directory: str, digest: str) -> (str, str):
+    base = os.path.join(directory, 'sprites-{}'.format(digest))
+    return base + '.bin', base + '.json'
+
+def _remove(paths: [str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # e.g. a sheet another process still has mapped on Windows
+            print('Could not remove {}: {}'.format(path, e), file=sys.stderr)
+
+def _remove_stale(directory: str, digest: str) -> None:
+    # Delete the bundles of every other content hash
+    current = set(_bundle_paths(directory, digest))
+    stale = [path for pattern in ('sprites-*.bin', 'sprites-*.json')
+             for path in glob.glob(os.path.join(directory, pattern)) if path not in current]
+    _remove(stale)
+
+def build(sprites: [(str, int)] = SPRITES, directory: str = ASSET_BUNDLE_DIR) -> str:
+    # Write the bundle for the current sources and return its index path
+    digest = content_hash(sprites)
+    sheet_path, index_path = _bundle_paths(directory, digest)
+    os.makedirs(directory, exist_ok=True)
+
+    entries = []
+    offset = 0
+    with open(sheet_path + '.tmp', 'wb') as sheet:
+        for path, angle in sprites:
+            with Image.open(path) as source:
+                image = source.convert('RGBA')
+            if angle:
+                image = image.rotate(angle, expand=True)
+            pixels = image.tobytes()
+            sheet.write(pixels)
+            entries.append((path, angle, image.width, image.height, offset))
+            offset += len(pixels)
+
+    with open(index_path + '.tmp', 'w') as index:
+        json.dump({'version': BUNDLE_VERSION, 'hash': digest, 'sprites': entries}, index)
+
+    # The index goes last, a bundle only counts as built once it exists
+    os.replace(sheet_path + '.tmp', sheet_path)
+    os.replace(index_path + '.tmp', index_path)
+    _remove_stale(directory, digest)
+    return index_path
+
+def _read(sheet_path: str, index_path: str, sprites: [(str, int)]) -> '{(str, int): Image}':
+    # Images of a built bundle. Raises ValueError, KeyError or TypeError when
+    # the files are not a whole bundle of sprites.
+    with open(index_path) as index:
+        entries = json.load(index)['sprites']
+    if {(path, angle) for path, angle, width, height, offset in entries} != set(sprites):
+        raise ValueError('Asset bundle index does not list the expected sprites')
+
+    with open(sheet_path, 'rb') as sheet:
+        # mmap raises ValueError for an empty sheet
+        pixels = memoryview(mmap.mmap(sheet.fileno(), 0, access=mmap.ACCESS_READ))
+    expected = sum(width * height * RGBA_BYTES for path, angle, width, height, offset in entries)
+    if len(pixels) != expected:
+        raise ValueError('Asset bundle sheet is {} bytes, expected {}'.format(len(pixels), expected))
+
+    images = dict()
+    for path, angle, width, height, offset in entries:
+        size = width * height * RGBA_BYTES
+        images[(path, angle)] = Image.frombuffer('RGBA', (width, height), pixels[offset:offset + size],
+                                                 'raw', 'RGBA', 0, 1)
+    return images
+
+def load(sprites: [(str, int)] = SPRITES, directory: str = ASSET_BUNDLE_DIR) -> '{(str, int): Image}':
+    # Images of the bundle for the current sources, built first if missing
+    # and rebuilt once if it can't be read
+    sheet_path, index_path = _bundle_paths(directory, content_hash(sprites))
+    if not os.path.exists(index_path):
+        build(sprites, directory)
+
+    try:
+        return _read(sheet_path, index_path, sprites)
+    except (FileNotFoundError, ValueError, KeyError, TypeError) as e:
+        print('Rebuilding asset bundle: {}'.format(e), file=sys.stderr)
+
+    _remove((sheet_path, index_path))
+    build(sprites, directory)
+    return _read(sheet_path, index_path, sprites)
+
+def preload(loader: 'ImageLoader', sprites: [(str, int)] = SPRITES, directory: str = ASSET_BUNDLE_DIR) -> bool:
+    # Fill loader from the bundle. Returns False, leaving loader to decode
+    # the GIFs itself, when the bundle can't be read or written.
+    try:
+        images = load(sprites, directory)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print('Asset bundle unavailable: {}'.format(e), file=sys.stderr)
+        return False
+
+    for (path, angle), image in images.items():
+        loader.add(path, image, angle)
+    return True
+
+def preload_async(loader: 'ImageLoader', sprites: [(str, int)] = SPRITES,
+                  directory: str = ASSET_BUNDLE_DIR) -> threading.Thread:
+    # preload() on a daemon thread. The loader can be used meanwhile, join()
+    # it first to be sure the bundled images are the ones served.
+    thread = threading.Thread(target=preload, args=(loader, sprites, directory), daemon=True)
+    thread.start()
+    return thread
+
+if __name__ == '__main__':
+    print(build())
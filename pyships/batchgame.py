@@ -0,0 +1,282 @@
+import numpy
+
+from .board import ROWS, COLUMNS, CELLS, CLASSIC_BOARD, _HIT, _MISS
+from .ships import FLEET
+
+# Headless engine that plays N independent classic games at once as stacked
+# NumPy arrays. One call to take_shots() applies one shot in every game with
+# the same rules as ClassicGame.take_shot/OceanGrid.shoot:
+#   - shots at a finished game, off the board or at a cell that already has
+#     a peg are rejected and leave that game (and its turn) unchanged
+#   - a valid shot pegs the opponent's ocean, and the turn always passes to
+#     the other player, including the shot that ends the game
+#   - the game is won by the player who sinks the opponent's last ship
+#
+# Internally both players' boards of a game share one byte per cell, a
+# nibble each holding the ship id and a PEGGED bit, so a step is one gather
+# and one scatter of a byte per game over a board that stays in cache. Every
+# game keeps the PEGGED bit of the board under fire, and a finished game is
+# pointed at a scratch board that is pegged everywhere, which rejects its
+# shots without a separate check. The bits of the board under fire are kept
+# for both parities of the step count, so a step where every running game
+# passes the turn only flips the parity.
+
+NO_PEG = -1
+NO_PLAYER = -1
+
+# Set in a nibble once the cell has a peg, the low bits are the ship id
+_PEGGED = 0x08
+_SHIP_BITS = _PEGGED - 1
+_NIBBLE = 4
+# Per-ship counters of a player, slot 0 (open water) unused
+_SHIP_SHIFT = _SHIP_BITS.bit_length()
+# Bits of the board under fire per game: its nibble and its PEGGED bit, and
+# what passing the turn xors them with
+_NIBBLE_MASK, _PEG = range(2)
+_LOW_NIBBLE = (0x0F, _PEGGED)
+_TURN_FLIP = numpy.array([0xFF, _PEGGED | (_PEGGED << _NIBBLE)], dtype=numpy.uint8)
+# Counter slot, (player << _SHIP_SHIFT) | ship id, of a cell byte masked to
+# one nibble without its PEGGED bit
+_SLOTS = numpy.array([(byte & _SHIP_BITS) or (1 << _SHIP_SHIFT) | (byte >> _NIBBLE) & _SHIP_BITS
+                      for byte in range(256)], dtype=numpy.intp)
+
+_NO_GAMES = numpy.zeros(0, dtype=numpy.intp)
+
+class BatchShotResult:
+    # Per-game masks for one take_shots() call. Few games sink a ship or end
+    # on any one shot, so sunk and game_over are only spread out over all
+    # games when they are read.
+    def __init__(self, valid: numpy.ndarray, hit: numpy.ndarray,
+                 sunk_games: numpy.ndarray, sunk_ids: numpy.ndarray, over_games: numpy.ndarray):
+        self.valid = valid          # shot was legal and applied
+        self.hit = hit              # shot hit a ship
+        self._sunk_games = sunk_games
+        self._sunk_ids = sunk_ids
+        self._over_games = over_games
+        self._sunk = None
+        self._game_over = None
+
+    @property
+    def sunk(self) -> numpy.ndarray:
+        # Id of the ship sunk by the shot, 0 if none
+        if self._sunk is None:
+            self._sunk = numpy.zeros(self.valid.shape, dtype=numpy.int8)
+            self._sunk[self._sunk_games] = self._sunk_ids
+        return self._sunk
+
+    @property
+    def game_over(self) -> numpy.ndarray:
+        # Shot ended the game
+        if self._game_over is None:
+            self._game_over = numpy.zeros(self.valid.shape, dtype=bool)
+            self._game_over[self._over_games] = True
+        return self._game_over
+
+class BatchGame:
+    def __init__(self, ships: numpy.ndarray, fleet_size: int = len(FLEET)):
+        # ships: (N, 2, ROWS, COLUMNS) ship ids per player's ocean grid.
+        # 0 is open water, 1..fleet_size are the ships (FLEET order for
+        # classic games). Ship lengths are taken from the grids.
+        ships = numpy.asarray(ships)
+        if ships.ndim != 4 or ships.shape[1:] != (2, ROWS, COLUMNS):
+            raise ValueError('ships must have shape (N, 2, {}, {})'.format(ROWS, COLUMNS))
+        if not 0 < fleet_size <= _SHIP_BITS:
+            raise ValueError('fleet_size must be between 1 and {}'.format(_SHIP_BITS))
+        # Ids past the fleet would spill into the PEGGED bit or the other
+        # player's nibble
+        if ships.size and (ships.min() < 0 or ships.max() > fleet_size):
+            raise ValueError('Ship ids must be between 0 and fleet_size ({})'.format(fleet_size))
+        self._ships = numpy.ascontiguousarray(ships, dtype=numpy.int8)
+
+        n = self._ships.shape[0]
+        self._size = n
+        self._fleet_size = fleet_size
+
+        # Player 1's cells in the low nibble, player 2's in the high one,
+        # then the scratch board of finished games
+        self._cells = numpy.empty((n + 1, CELLS), dtype=numpy.uint8)
+        grids = self._ships.reshape(n, 2, CELLS).view(numpy.uint8)
+        self._cells[:n] = grids[:, 0] | (grids[:, 1] << _NIBBLE)
+        self._cells[n] = _PEGGED | (_PEGGED << _NIBBLE)
+        self._scratch = n * CELLS
+        self._base = numpy.arange(n, dtype=numpy.intp) * CELLS
+
+        # Bits of the board the current player shoots at, by parity of the
+        # step count. Player 1 shoots first.
+        self._turn = numpy.empty((2, len(_LOW_NIBBLE), n), dtype=numpy.uint8)
+        self._turn[0] = (numpy.array(_LOW_NIBBLE, dtype=numpy.uint8) ^ _TURN_FLIP)[:, None]
+        self._turn[1] = self._turn[0] ^ _TURN_FLIP[:, None]
+        self._turns = (tuple(self._turn[0]), tuple(self._turn[1]))
+        self._parity = 0
+
+        # Hits left before each ship sinks. The counters of a player are one
+        # 64-bit word, which is 0 once the whole fleet is sunk.
+        self._remaining = numpy.zeros((n, 2, 1 << _SHIP_SHIFT), dtype=numpy.int8)
+        for ship_id in range(1, fleet_size + 1):
+            self._remaining[:, :, ship_id] = (self._ships == ship_id).sum(axis=(2, 3))
+
+        self._open = n
+        self._is_over = numpy.zeros(n, dtype=bool)
+
+    @classmethod
+    def from_games(cls, games: '[ClassicGame]') -> 'BatchGame':
+        # Copy the current state of classic board ClassicGames, e.g. to
+        # cross-check the engines. Ship ids follow FLEET order, every player
+        # needs one placed ship of each type (see ClassicPlayer.fleet).
+        ships = numpy.zeros((len(games), 2, CELLS), dtype=numpy.int8)
+        pegged = numpy.zeros(ships.shape, dtype=bool)
+        current = numpy.zeros(len(games), dtype=numpy.uint8)
+        winner = numpy.full(len(games), NO_PLAYER, dtype=numpy.int8)
+        ship_ids = {ship_type.__name__: ship_id for ship_id, ship_type in enumerate(FLEET, 1)}
+
+        for g, game in enumerate(games):
+            if game.board != CLASSIC_BOARD:
+                raise ValueError('BatchGame only plays the classic board, not {!r}'.format(game.board))
+            players = game.players
+            for p, player in enumerate(players):
+                fleet = {name: ship for name, ship in player.fleet() if ship is not None and ship.is_placed}
+                if sorted(fleet) != sorted(ship_ids):
+                    raise ValueError('{} does not have one placed ship of every FLEET type'.format(player.name))
+                ids = {id(ship): ship_ids[name] for name, ship in fleet.items()}
+
+                # Cells and pegs as the grid holds them
+                grid = player.ocean_grid
+                for cell in range(CELLS):
+                    ship = grid.at_cell(cell)
+                    if ship is not None:
+                        ships[g, p, cell] = ids[id(ship)]
+                hits, misses = grid.peg_masks()
+                pegs = hits | misses
+                pegged[g, p] = [pegs >> cell & 1 for cell in range(CELLS)]
+
+            current[g] = players.index(game.current_player)
+            if game.winner is not None:
+                winner[g] = players.index(game.winner)
+
+        ships = ships.reshape(len(games), 2, ROWS, COLUMNS)
+        pegged = pegged.reshape(ships.shape)
+        batch = cls(ships)
+        n = len(games)
+        pegs = numpy.where(pegged, _PEGGED, 0).astype(numpy.uint8).reshape(n, 2, CELLS)
+        batch._cells[:n] |= pegs[:, 0] | (pegs[:, 1] << _NIBBLE)
+        hits = pegged & (ships > 0)
+        for ship_id in range(1, batch._fleet_size + 1):
+            batch._remaining[:, :, ship_id] -= ((ships == ship_id) & hits).sum(axis=(2, 3)).astype(numpy.int8)
+        batch._is_over = winner != NO_PLAYER
+        batch._open = n - int(batch._is_over.sum())
+        batch._base[batch._is_over] = batch._scratch
+        # The opponent's nibble is the high one when player 1 is to shoot
+        batch._turn ^= ((current == 1)[None, None] * _TURN_FLIP[None, :, None]).astype(numpy.uint8)
+        return batch
+
+    def take_shots(self, rows: numpy.ndarray, cols: numpy.ndarray) -> BatchShotResult:
+        # Current player of every game shoots at (rows[i], cols[i]) (0-based)
+        rows = numpy.asarray(rows)
+        cols = numpy.asarray(cols)
+        on_board = (rows >= 0) & (rows < ROWS) & (cols >= 0) & (cols < COLUMNS)
+        return self._take_shots(numpy.where(on_board, rows * COLUMNS + cols, 0), on_board)
+
+    def take_cell_shots(self, cells: numpy.ndarray) -> BatchShotResult:
+        # Same as take_shots with flat cell indices (row * COLUMNS + col), the
+        # cheapest form for strategies that already work on cell indices.
+        # Any integer dtype is used as is, uint8 is the smallest that fits.
+        cells = numpy.asarray(cells)
+        if cells.dtype.kind not in 'iu':
+            cells = cells.astype(numpy.intp)
+        # Negative cells are huge as unsigned, one max() checks both ends
+        if not cells.size or cells.view('u{}'.format(cells.itemsize)).max() < CELLS:
+            return self._take_shots(cells, None)
+        on_board = (cells >= 0) & (cells < CELLS)
+        return self._take_shots(numpy.where(on_board, cells, 0), on_board)
+
+    def _take_shots(self, cells: numpy.ndarray, on_board: numpy.ndarray) -> BatchShotResult:
+        # One gather and one scatter of the target cells, everything else is
+        # done on the (few) games that hit
+        board = self._cells.reshape(-1)
+        nibble, peg = self._turns[self._parity]
+        was_open = self._open
+        flat = self._base + cells
+        old = board[flat]
+
+        # The opponent's nibble, a hit is a ship id without the PEGGED bit
+        target = old & nibble
+        valid = target < peg
+        if on_board is None:
+            # Rejected shots are at pegged cells already, pegging them again
+            # changes nothing
+            board[flat] = old | peg
+        else:
+            valid &= on_board
+            board[flat] = old | (peg * valid)
+        hit = numpy.logical_and(valid, target)
+
+        sunk = ids = over = _NO_GAMES
+        g = numpy.flatnonzero(hit)
+        if g.size:
+            # take() skips the copy [] makes of a uint8 index
+            ship = (g << (_SHIP_SHIFT + 1)) | _SLOTS.take(target[g])
+            remaining = self._remaining.reshape(-1)
+            left = remaining[ship]
+            left -= 1
+            remaining[ship] = left
+
+            sinks = numpy.flatnonzero(left == 0)
+            if sinks.size:
+                sunk = g[sinks]
+                ship = ship[sinks]
+                ids = ship & _SHIP_BITS
+                over = sunk[remaining.view(numpy.uint64)[ship >> _SHIP_SHIFT] == 0]
+                if over.size:
+                    self._is_over[over] = True
+                    self._base[over] = self._scratch
+                    self._open -= over.size
+
+        # The turn passes on every valid shot. Finished games shoot at the
+        # scratch board whatever their turn, so when no running game was
+        # rejected all turns pass with the parity.
+        self._parity ^= 1
+        if numpy.count_nonzero(valid) != was_open:
+            # Rejected games keep their turn
+            self._turn ^= (~valid * _TURN_FLIP[:, None]).astype(numpy.uint8)
+
+        return BatchShotResult(valid, hit, sunk, ids, over)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def ships(self) -> numpy.ndarray:
+        return self._ships
+
+    @property
+    def pegs(self) -> numpy.ndarray:
+        # (N, 2, ROWS, COLUMNS) pegs on each player's ocean grid, NO_PEG if
+        # empty. Built from the board cells on every call.
+        cells = self._cells[:self._size]
+        pegged = numpy.stack((cells & _PEGGED, cells & (_PEGGED << _NIBBLE)), axis=1).reshape(self._ships.shape)
+        return numpy.where(pegged != 0, numpy.where(self._ships > 0, _HIT, _MISS), NO_PEG).astype(numpy.int8)
+
+    @property
+    def remaining(self) -> numpy.ndarray:
+        # (N, 2, fleet_size) hits left per ship
+        return self._remaining[:, :, 1:self._fleet_size + 1]
+
+    @property
+    def current_player(self) -> numpy.ndarray:
+        # Player to shoot next in every game. The turn passed to the loser on
+        # the winning shot.
+        current = (self._turn[self._parity, _PEG] >> (_NIBBLE + _SHIP_SHIFT)) ^ 1
+        return numpy.where(self._is_over, self.winner ^ 1, current).astype(numpy.intp)
+
+    @property
+    def winner(self) -> numpy.ndarray:
+        # Index of the winning player, NO_PLAYER while the game is running.
+        # The loser is the one without hits left on any ship.
+        fleets = self._remaining.view(numpy.uint64).reshape(self._size, 2)
+        winner = numpy.where(fleets[:, 1] == 0, 0, 1).astype(numpy.int8)
+        winner[~self._is_over] = NO_PLAYER
+        return winner
+
+    @property
+    def is_over(self) -> numpy.ndarray:
+        return self._is_over
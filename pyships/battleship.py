@@ -1,5 +1,3 @@
-from PIL import Image, ImageTk
-
 from .errortypes import (
     OffBoardError, 
     LengthError, 
@@ -20,130 +18,230 @@ from .ships import (
     Carrier,
     Destroyer,
     Submarine,
-    PatrolBoat
+    PatrolBoat,
+    FLEET
 )
 
-ROWS = 10
-COLUMNS = 10
-ROW_NUMBERS = {'A':0, 'B': 1, 'C': 2, 'D': 3, 'E':4,
-                'F':5, 'G': 6, 'H': 7, 'I': 8, 'J': 9}
-ROW_LETTERS = {0:'A', 1:'B', 2:'C', 3:'D', 4:'E',
-                5:'F', 6:'G', 7:'H', 8:'I', 9:'J'}
-
-def _location_is_valid(location: (str, int)) -> bool:
-    if location[0] in ROW_NUMBERS:
-        row = ROW_NUMBERS[location[0]]
-        col = location[1]
-
-        return not (row < 0 or row >= ROWS
-                    or col < 0 or col >= COLUMNS)
-
-
-    return False
-        
-RED = _HIT = 1
-WHITE = _MISS = 0
-
-def _place_ship_parts(start: (str, int), end: (str, int), holes: [[ShipPart]], ship: Ship) -> None:
-    if not _location_is_valid(start) or not _location_is_valid(end):
-        raise OffBoardError()
-    
-    start_row, start_col = ROW_NUMBERS[start[0]], start[1]
-    end_row, end_col = ROW_NUMBERS[end[0]], end[1]
-
-    if (start_row != end_row) and (start_col != end_col):
-        raise OffBoardError()
+from .board import (
+    ROWS,
+    COLUMNS,
+    ROW_NUMBERS,
+    ROW_LETTERS,
+    RED,
+    WHITE,
+    _HIT,
+    _MISS,
+    CELLS,
+    CELL_INDEX,
+    CELL_LOCATIONS,
+    CLASSIC_BOARD,
+    Board,
+    cell_index,
+    cell_location
+)
 
-    assumed_length = 0
-    if start_row == end_row:
-        assumed_length = abs(end_col - start_col) + 1
-    else:
-        assumed_length = abs(end_row - start_row) + 1
-        
-    actual_length = ship.length
+from .placements import (
+    PLACE_OK,
+    PLACE_OFF_BOARD,
+    PLACE_BAD_LENGTH,
+    PLACE_SHIP_IN_WAY,
+    PLACEMENT_ERRORS,
+    layout_placements,
+    placement_status
+)
 
-    if assumed_length != actual_length:
-        raise LengthError()
-    
-    is_vertical = start_row != end_row
-
-    locations = []
-    if is_vertical:
-        row = 0
-        col = start_col
-        if start_row < end_row:
-            row = start_row
-        else:
-            row = end_row
-        for i in range(ship.length):
-            if not holes[row + i][col]:
-                locations.append((ROW_LETTERS[row + i], col))
-                holes[row + i][col] = ship.parts[i]
-            else:
-                raise ShipInWayError()
-    else:
-        col = 0
-        row = start_row
-        if start_col < end_col:
-            col = start_col
-        else:
-            col = end_col
-            
-        for i in range(ship.length):
-            if not holes[row][col + i]:
-                locations.append((ROW_LETTERS[row], col + i))
-                holes[row][col + i] = ship.parts[i]
+from .bitboard import BitOceanGrid, BitTargetGrid
+
+from .snapshot import encode_game, decode_game
+
+def _ship_part_status(start: int, end: int, holes: [ShipPart], length: int, board: Board) -> (int, (int,)):
+    # (status, cells) of placing a ship of length into holes, changing nothing
+    status, cells = placement_status(start, end, length, board)
+    if status == PLACE_OK:
+        for cell in cells:
+            if holes[cell]:
+                return PLACE_SHIP_IN_WAY, cells
+    return status, cells
+
+def _try_place_ship_parts(start: int, end: int, holes: [ShipPart], ship: Ship, board: Board = CLASSIC_BOARD) -> int:
+    # Every cell is checked before any is written, so a placement that
+    # fails leaves holes and ship untouched
+    status, cells = _ship_part_status(start, end, holes, ship.length, board)
+    if status != PLACE_OK:
+        return status
+
+    for cell, part in zip(cells, ship.parts):
+        holes[cell] = part
+
+    ship.place([board.cell_location(cell) for cell in cells])
+    return PLACE_OK
+
+def _place_ship_parts(start: int, end: int, holes: [ShipPart], ship: Ship, board: Board = CLASSIC_BOARD) -> None:
+    status = _try_place_ship_parts(start, end, holes, ship, board)
+    if status != PLACE_OK:
+        raise PLACEMENT_ERRORS[status]()
+
+class _SparseCells(dict):
+    # Cell storage holding only the cells that were written, reads of any
+    # other cell give None like an empty cell of a dense list
+    __slots__ = ()
+
+    def __missing__(self, cell: int) -> None:
+        return None
+
+def _new_cells(board: Board, sparse: bool) -> list:
+    return _SparseCells() if sparse else [None] * board.cells
+
+def _rows(cells: list, board: Board) -> [list]:
+    # Split flat cells into rows
+    columns = board.columns
+    return [[cells[cell] for cell in range(r * columns, (r + 1) * columns)] for r in range(board.rows)]
+
+def _ship_mask(holes: [ShipPart]) -> int:
+    mask = 0
+    cells = holes.items() if isinstance(holes, dict) else enumerate(holes)
+    for cell, part in cells:
+        if part:
+            mask |= 1 << cell
+    return mask
+
+def _grid_str(holes: [ShipPart], pegs: [int], board: Board) -> str:
+    part_str = '{:<2}'
+    columns = board.columns
+    lines = ['  ' + ''.join(part_str.format(c+1) for c in range(columns))]
+    for r in range(board.rows):
+        row = ['{} '.format(board.row_letters[r])]
+        for cell in range(r * columns, (r + 1) * columns):
+            if holes[cell]:
+                row.append(part_str.format(str(holes[cell])))
+            elif pegs[cell] != None:
+                row.append(part_str.format(pegs[cell]))
             else:
-                raise ShipInWayError()
-
-    ship.place(locations)
-
+                row.append('..')
+        lines.append(''.join(row))
+
+    return '\n'.join(lines).rstrip()
+
+# The grids store cells in flat lists indexed by cell (row * columns + col).
+# The *_cell methods take those indices directly; the (letter, int) methods
+# are thin adapters over them for the console and UI.
+#
+# With sparse=True only occupied and pegged cells are stored, so memory and
+# per-shot cost follow the number of ships and shots rather than the board
+# area (for very large boards).
 class OceanGrid:
-    def __init__(self):
+    __slots__ = ('_board', '_holes', '_pegs', '_ships', '_ships_afloat')
+
+    def __init__(self, board: Board = None, sparse: bool = False):
+        self._board = board if board is not None else CLASSIC_BOARD
         # Cells to place ships on 
-        self._holes = [[None for c in range(COLUMNS)] for r in range(ROWS)]
+        self._holes = _new_cells(self._board, sparse)
         # Cells for pegs
-        self._pegs = [[None for c in range(COLUMNS)] for r in range(ROWS)]
+        self._pegs = _new_cells(self._board, sparse)
+        # Placed ships in placement order
+        self._ships = []
+        # Placed ships that are not destroyed
+        self._ships_afloat = 0
 
     def place(self, start: (str, int), end: (str, int), ship: Ship) -> None:
-        _place_ship_parts(start, end, self._holes, ship)
+        self.place_cell(self._board.cell_index(start), self._board.cell_index(end), ship)
+
+    def place_cell(self, start: int, end: int, ship: Ship) -> None:
+        status = self.try_place_cell(start, end, ship)
+        if status != PLACE_OK:
+            raise PLACEMENT_ERRORS[status]()
+
+    # The can_place/try_place methods report a failed placement as one of
+    # the PLACE_* status codes instead of raising. can_place only checks,
+    # try_place places the ship when the status is PLACE_OK and otherwise
+    # changes nothing.
+    def can_place(self, start: (str, int), end: (str, int), length: int) -> int:
+        return self.can_place_cell(self._board.cell_index(start), self._board.cell_index(end), length)
+
+    def can_place_cell(self, start: int, end: int, length: int) -> int:
+        return _ship_part_status(start, end, self._holes, length, self._board)[0]
+
+    def try_place(self, start: (str, int), end: (str, int), ship: Ship) -> int:
+        return self.try_place_cell(self._board.cell_index(start), self._board.cell_index(end), ship)
+
+    def try_place_cell(self, start: int, end: int, ship: Ship) -> int:
+        status = _try_place_ship_parts(start, end, self._holes, ship, self._board)
+        if status == PLACE_OK:
+            self._ships.append(ship)
+            self._ships_afloat += 1
+        return status
+
+    def place_fleet(self, ships: [Ship], layout: (int,)) -> None:
+        # Place every ship at once, ships[i] at placement layout[i] (see
+        # fleetgen). Either all of them are placed or none is.
+        status = self.try_place_fleet(ships, layout)
+        if status != PLACE_OK:
+            raise PLACEMENT_ERRORS[status]()
+
+    def try_place_fleet(self, ships: [Ship], layout: (int,)) -> int:
+        status, chosen, occupied = layout_placements(layout, [ship.length for ship in ships], self._board)
+        if status != PLACE_OK:
+            return status
+
+        holes = self._holes
+        for cells, mask in chosen:
+            for cell in cells:
+                if holes[cell]:
+                    return PLACE_SHIP_IN_WAY
+
+        for ship, (cells, mask) in zip(ships, chosen):
+            for cell, part in zip(cells, ship.parts):
+                holes[cell] = part
+            ship.place([self._board.cell_location(cell) for cell in cells])
+        self._ships.extend(ships)
+        self._ships_afloat += len(ships)
+        return PLACE_OK
 
     def unplace(self, ship: Ship) -> None:
-        part_locations = [part.location for part in ship.parts]
-
-        for loc in part_locations:
-            row = ROW_NUMBERS[loc[0]]
-            col = loc[1]
+        for part in ship.parts:
             # TODO: Raise UnplaceError if part has been shot
-            self._holes[row][col] = None
+            self._holes[self._board.cell_index(part.location)] = None
             
+        self._ships.remove(ship)
+        if not ship.is_destroyed:
+            self._ships_afloat -= 1
         ship.unplace()
 
     def shoot(self, location: (str, int)) -> bool:
-        if not _location_is_valid(location):
+        return self.receive_shot_cell(self._board.cell_index(location)) is not None
+
+    def shoot_cell(self, cell: int) -> bool:
+        return self.receive_shot_cell(cell) is not None
+
+    def receive_shot(self, location: (str, int)) -> Ship:
+        return self.receive_shot_cell(self._board.cell_index(location))
+
+    def receive_shot_cell(self, cell: int) -> Ship:
+        # Shoot cell and return the ship that was hit (None on a miss)
+        if not 0 <= cell < self._board.cells:
             raise BadShotLocationError()
-        
-        shot_row, shot_col = ROW_NUMBERS[location[0]], location[1]
-        ship_part = self._holes[shot_row][shot_col]
 
+        ship_part = self._holes[cell]
         if ship_part:
             ship_part.on_hit()
-            self._place_peg(location, _HIT)
-            return True
-        else:
-            self._place_peg(location, _MISS)
-            return False
+            self._place_peg(cell, _HIT)
+            ship = ship_part.owner
+            if ship.is_destroyed:
+                self._ships_afloat -= 1
+            return ship
 
-        
-        return False
+        self._place_peg(cell, _MISS)
+        return None
 
     def at(self, location: (str, int)) -> Ship:
         # Return the ship at location
-        if not _location_is_valid(location):
+        return self.at_cell(self._board.cell_index(location))
+
+    def at_cell(self, cell: int) -> Ship:
+        if not 0 <= cell < self._board.cells:
             raise BadLocationError()
 
-        row, col = ROW_NUMBERS[location[0]], location[1]
-        part = self._holes[row][col]
+        part = self._holes[cell]
         part_owner = None
         if part:
             part_owner = part.owner
@@ -151,94 +249,172 @@ class OceanGrid:
         return part_owner
 
     @property
-    def pegs(self) -> [[int]]:
-        return self._pegs
+    def board(self) -> Board:
+        return self._board
 
-    def _place_peg(self, location: (str, int), peg: int) -> None:
-        shot_row, shot_col = ROW_NUMBERS[location[0]], location[1]
-        if not self._pegs[shot_row][shot_col]:
-            self._pegs[shot_row][shot_col] = peg
+    @property
+    def ships(self) -> [Ship]:
+        # Ships placed on the grid, in placement order
+        return list(self._ships)
+
+    @property
+    def ships_afloat(self) -> int:
+        return self._ships_afloat
+
+    @property
+    def pegs(self) -> [[int]]:
+        return _rows(self._pegs, self._board)
+
+    def peg_masks(self) -> (int, int):
+        # (hits, misses) as bitmasks of cell indices
+        hits = misses = 0
+        cells = self._pegs.items() if isinstance(self._pegs, dict) else enumerate(self._pegs)
+        for cell, peg in cells:
+            if peg == _HIT:
+                hits |= 1 << cell
+            elif peg == _MISS:
+                misses |= 1 << cell
+        return hits, misses
+
+    def peg_cells(self) -> ([int], [int]):
+        # (hit cells, miss cells) in ascending order, without building masks
+        # as large as the board
+        hits = []
+        misses = []
+        cells = sorted(self._pegs.items()) if isinstance(self._pegs, dict) else enumerate(self._pegs)
+        for cell, peg in cells:
+            if peg == _HIT:
+                hits.append(cell)
+            elif peg == _MISS:
+                misses.append(cell)
+        return hits, misses
+
+    def ship_mask(self) -> int:
+        # Cells covered by a ship part as a bitmask of cell indices
+        return _ship_mask(self._holes)
+
+    def _place_peg(self, cell: int, peg: int) -> None:
+        if not self._pegs[cell]:
+            self._pegs[cell] = peg
 
-        
     def __str__(self):
-        string = '  '
-        part_str = '{:<2}'
-        for c in range(COLUMNS):
-            string += '{:<2}'.format(c+1)
-        string += '\n'
-        for r in range(ROWS):
-            string += '{} '.format(ROW_LETTERS[r])
-            for c in range(COLUMNS):
-                if self._holes[r][c]:
-                    string += part_str.format(str(self._holes[r][c]))
-                else:
-                    if self._pegs[r][c] != None:
-                        string += part_str.format(self._pegs[r][c])
-                    else:
-                        string += part_str.format('..')
-            string += '\n'
-
-        return string.rstrip()
+        return _grid_str(self._holes, self._pegs, self._board)
 
 class TargetGrid:
-    def __init__(self):
+    __slots__ = ('_board', '_pegs', '_enemy_ships', '_sunk_ships')
+
+    def __init__(self, board: Board = None, sparse: bool = False):
+        self._board = board if board is not None else CLASSIC_BOARD
         # Pegs to place hit/miss markers on
-        self._pegs = [[None for c in range(COLUMNS)] for r in range(ROWS)]
+        self._pegs = _new_cells(self._board, sparse)
 
         # Enemy destroyed ship parts
-        self._enemy_ships = [[None for c in range(COLUMNS)] for r in range(ROWS)]
+        self._enemy_ships = _new_cells(self._board, sparse)
+        # Enemy destroyed ships in the order they sank
+        self._sunk_ships = []
 
     def hit(self, location: (str, int)) -> None:
-        self._place_peg(location, _HIT)
+        self._place_peg(self._board.cell_index(location), _HIT)
+
+    def hit_cell(self, cell: int) -> None:
+        self._place_peg(cell, _HIT)
 
     def miss(self, location: (str, int)) -> None:
-        self._place_peg(location, _MISS)
+        self._place_peg(self._board.cell_index(location), _MISS)
+
+    def miss_cell(self, cell: int) -> None:
+        self._place_peg(cell, _MISS)
 
     def place_enemy(self, start: (str, int), end: (str, int), ship: Ship) -> None:
         # Place enemy ship parts
-        _place_ship_parts(start, end, self._enemy_ships, ship)
-        
-        
-    def _place_peg(self, location: (str, int), peg: int) -> None:
-        if not _location_is_valid(location):
+        self.place_enemy_cell(self._board.cell_index(start), self._board.cell_index(end), ship)
+
+    def place_enemy_cell(self, start: int, end: int, ship: Ship) -> None:
+        _place_ship_parts(start, end, self._enemy_ships, ship, self._board)
+        self._sunk_ships.append(ship)
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def sunk_ships(self) -> [Ship]:
+        # Enemy ships placed with place_enemy, in the order they sank
+        return list(self._sunk_ships)
+
+    def peg_masks(self) -> (int, int):
+        # (hits, misses) as bitmasks of cell indices
+        hits = misses = 0
+        cells = self._pegs.items() if isinstance(self._pegs, dict) else enumerate(self._pegs)
+        for cell, peg in cells:
+            if peg == _HIT:
+                hits |= 1 << cell
+            elif peg == _MISS:
+                misses |= 1 << cell
+        return hits, misses
+
+    def ship_mask(self) -> int:
+        # Cells covered by sunk enemy ship parts as a bitmask of cell indices
+        return _ship_mask(self._enemy_ships)
+
+    def _place_peg(self, cell: int, peg: int) -> None:
+        if not 0 <= cell < self._board.cells:
             raise BadPegLocationError()
-        peg_row, peg_col = ROW_NUMBERS[location[0]], location[1]
         
-        if self._pegs[peg_row][peg_col] != None:
+        if self._pegs[cell] != None:
             raise HasPegError()
 
-        self._pegs[peg_row][peg_col] = peg
+        self._pegs[cell] = peg
 
     def __str__(self):
-        string = '  '
-        part_str = '{:<2}'
-        for c in range(COLUMNS):
-            string += '{:<2}'.format(c+1)
-        string += '\n'
-        for r in range(ROWS):
-            string += '{} '.format(ROW_LETTERS[r])
-            for c in range(COLUMNS):
-                if self._enemy_ships[r][c]:
-                    string += part_str.format(str(self._enemy_ships[r][c]))
-                else:
-                    if self._pegs[r][c] != None:
-                        string += part_str.format(self._pegs[r][c])
-                    else:
-                        string += part_str.format('..')
-            string += '\n'
-
-        return string.rstrip()
+        return _grid_str(self._enemy_ships, self._pegs, self._board)
+
+class SparseOceanGrid(OceanGrid):
+    __slots__ = ()
+
+    def __init__(self, board: Board = None):
+        super().__init__(board, sparse=True)
+
+class SparseTargetGrid(TargetGrid):
+    __slots__ = ()
+
+    def __init__(self, board: Board = None):
+        super().__init__(board, sparse=True)
+
+# Grid implementations a player's board can be built with, by name
+BACKENDS = {'list': (OceanGrid, TargetGrid),
+            'bitboard': (BitOceanGrid, BitTargetGrid),
+            'sparse': (SparseOceanGrid, SparseTargetGrid)}
 
 class ClassicPlayer:
+    __slots__ = ('name', 'ocean_grid', 'target_grid', 'ships')
+
     def __init__(self, name: str = 'Player',
-                 ocean_grid: OceanGrid = None, target_grid: TargetGrid = None, ships: 'dict[str:Ship]' = None):
+                 ocean_grid: OceanGrid = None, target_grid: TargetGrid = None, ships: 'dict[str:Ship]' = None,
+                 backend: str = 'list', board: Board = None):
+        if backend not in BACKENDS:
+            raise ValueError('Unknown grid backend: {}'.format(backend))
+        ocean_grid_type, target_grid_type = BACKENDS[backend]
+
         self.name = name
-        self.ocean_grid = ocean_grid if ocean_grid is not None else OceanGrid()
-        self.target_grid = target_grid if target_grid is not None else TargetGrid()
-        DEFAULT_SHIPS = {Carrier.__name__: None, BattleShip.__name__: None, Destroyer.__name__: None,
-                         Submarine.__name__: None, PatrolBoat.__name__: None}
+        self.ocean_grid = ocean_grid if ocean_grid is not None else ocean_grid_type(board)
+        self.target_grid = target_grid if target_grid is not None else target_grid_type(board)
+        DEFAULT_SHIPS = {ship_type.__name__: None for ship_type in FLEET}
         self.ships = ships if ships is not None else DEFAULT_SHIPS
 
+    @classmethod
+    def from_layout(cls, layout: (int,), name: str = 'Player', backend: str = 'list',
+                    fleet: (type,) = FLEET, board: Board = None) -> 'ClassicPlayer':
+        # Player with a ship of every type in fleet placed as in layout (see
+        # fleetgen), validated as a whole before anything is placed. Layouts
+        # index the classic board's placements, any other board raises
+        # ValueError.
+        player = cls(name, backend=backend, board=board)
+        ships = [ship_type() for ship_type in fleet]
+        player.ocean_grid.place_fleet(ships, layout)
+        player.ships = {ship_type.__name__: ship for ship_type, ship in zip(fleet, ships)}
+        return player
+
     def ships_are_placed(self) -> bool:
         # determine if all the player's ships are placed
         all_placed = True
@@ -251,66 +427,152 @@ class ClassicPlayer:
 ##                    break
         return all_placed
 
+    def fleet(self) -> [(str, Ship)]:
+        # (type name, ship or None) of every entry of ships, with the ships
+        # placed on the ocean grid directly (e.g. with OceanGrid.place) filled
+        # in under their type name. The grid is the record of what is placed,
+        # so a placed ship in ships that is not on it, or two placed ships of
+        # one type, raise ValueError.
+        fleet = dict(self.ships)
+        placed = self.ocean_grid.ships
+        on_grid = set(map(id, placed))
+        for name, ship in fleet.items():
+            if ship is not None and ship.is_placed and id(ship) not in on_grid:
+                raise ValueError('{} of {} is not placed on its ocean grid'.format(name, self.name))
+
+        for ship in placed:
+            name = type(ship).__name__
+            listed = fleet.get(name)
+            if listed is ship:
+                continue
+            if listed is not None and listed.is_placed:
+                raise ValueError('{} has more than one placed {}'.format(self.name, name))
+            fleet[name] = ship
+
+        return list(fleet.items())
+
     def ships_are_destroyed(self) -> bool:
-        destroyed_ships = list(filter(lambda ship: ship.is_destroyed, self.ships.values()))
-        return len(destroyed_ships) == len(self.ships)
-        
+        return self.ocean_grid.ships_afloat == 0
+
+    @property
+    def ships_afloat(self) -> int:
+        # Kept up to date by the ocean grid as ships are placed and sunk
+        return self.ocean_grid.ships_afloat
+
+class ShotResult:
+    # Outcome of one shot taken in a ClassicGame
+    __slots__ = ('cell', 'ship', 'is_hit', 'sunk_ship', 'is_game_over', '_board')
+
+    def __init__(self, cell: int, ship: Ship, is_game_over: bool, board: Board = CLASSIC_BOARD):
+        self.cell = cell
+        self._board = board
+        # Ship that was hit, None on a miss
+        self.ship = ship
+        self.is_hit = ship is not None
+        # Ship that the shot destroyed, None if nothing sank
+        self.sunk_ship = ship if ship is not None and ship.is_destroyed else None
+        self.is_game_over = is_game_over
+
+    @property
+    def location(self) -> (str, int):
+        return self._board.cell_location(self.cell)
+
 
 class ClassicGame:
-    def __init__(self, player1: ClassicPlayer, player2: ClassicPlayer):
-        # TODO: validate that both player's grids are valid (5 ships, empty target)
+    __slots__ = ('_board', '_player1', '_player2', '_current_player', '_is_over', '_winner', '_log')
+
+    def __init__(self, player1: ClassicPlayer, player2: ClassicPlayer, board: Board = None,
+                 log: 'GameLog' = None):
+        if board is None:
+            board = player1.ocean_grid.board
+        fleet_names = sorted(ship_type.__name__ for ship_type in FLEET)
+        for player in (player1, player2):
+            if player.ocean_grid.board != board or player.target_grid.board != board:
+                raise GameError('Player grids do not match the game board')
+
+            # One placed ship of every FLEET type on the ocean grid, and
+            # nothing shot at yet from the target grid
+            try:
+                fleet = player.fleet()
+            except ValueError as e:
+                raise GameError(str(e)) from None
+            placed = sorted(name for name, ship in fleet if ship is not None and ship.is_placed)
+            if placed != fleet_names or len(player.ocean_grid.ships) != len(FLEET):
+                raise GameError('{} must have exactly one placed ship of every FLEET type'.format(player.name))
+            if player.target_grid.peg_masks() != (0, 0) or player.target_grid.ship_mask():
+                raise GameError('{} has shots on its target grid already'.format(player.name))
+
+        self._board = board
         self._player1 = player1
         self._player2 = player2
         self._current_player = player1
         self._is_over = False
         self._winner = None
+        # Optional gamelog.GameLog recording every accepted shot
+        self._log = log
 
     def take_shot(self, location: (str, int)) -> Ship:
         # Return the ship that was hit
-        opponent = None
-        player = None
-        if self._current_player == self._player1:
-            opponent = self._player2
-            player = self._player1
-        else:
-            opponent = self._player1
-            player = self._player2
-            
-        opponent_ocean_grid = opponent.ocean_grid
-        current_target_grid = player.target_grid
+        return self.fire_cell(self._board.cell_index(location)).ship
 
-        is_hit = False
-        
-        if not self._is_over:
-            is_hit = opponent_ocean_grid.shoot(location)
-        else:
+    def take_shot_cell(self, cell: int) -> Ship:
+        return self.fire_cell(cell).ship
+
+    def fire(self, location: (str, int)) -> ShotResult:
+        return self.fire_cell(self._board.cell_index(location))
+
+    def fire_cell(self, cell: int) -> ShotResult:
+        # Take the current player's shot, resolving hit, sinking and game over
+        # with a single lookup on the opponent's grid
+        if self._is_over:
             raise GameOverError()
 
-        hit_ship = None
-        if is_hit:
-            hit_ship = opponent_ocean_grid.at(location)
+        if self._current_player is self._player1:
+            player, opponent = self._player1, self._player2
+        else:
+            player, opponent = self._player2, self._player1
+
+        log = self._log
+        if log is not None and not log.keyframes:
+            log.record_start(self)
+
+        current_target_grid = player.target_grid
+        hit_ship = opponent.ocean_grid.receive_shot_cell(cell)
+
+        if hit_ship:
             if hit_ship.is_destroyed:
                 current_target_grid.place_enemy(hit_ship.start(), hit_ship.end(), hit_ship)
 
             # Mark spot with peg
-            current_target_grid.hit(location)
-            #opponent_destroyed_ships = [ship for ship in opponent.ships if ship.is_destroyed]
-##            opponent_destroyed_ships = list(filter(lambda ship: ship.is_destroyed, opponent.ships.values()))
-            opponent_ships_are_destroyed = opponent.ships_are_destroyed()
-##            opponent_destroyed_ships = [opponent.ships[name] for name in opponent.ships if opponent.ships[name].is_destroyed]
-##            if len(opponent_destroyed_ships) == len(opponent.ships):
-            if opponent_ships_are_destroyed:
+            current_target_grid.hit_cell(cell)
+            if opponent.ships_are_destroyed():
                 self._is_over = True
                 self._winner = player
         else:
-            current_target_grid.miss(location)       
+            current_target_grid.miss_cell(cell)
 
-        if self._current_player == self._player1:
-            self._current_player = self._player2
-        else:
-            self._current_player = self._player1
-            
-        return hit_ship
+        self._current_player = opponent
+
+        result = ShotResult(cell, hit_ship, self._is_over, self._board)
+        if log is not None:
+            log.record_shot(self, 0 if player is self._player1 else 1, result)
+        return result
+
+    def to_bytes(self, include_names: bool = False) -> bytes:
+        # Compact versioned snapshot of the game, see snapshot.py
+        return encode_game(self, include_names)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, names: (str, str) = None, backend: str = 'list') -> 'ClassicGame':
+        return decode_game(data, names, backend)
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def players(self) -> (ClassicPlayer, ClassicPlayer):
+        return self._player1, self._player2
 
     @property
     def winner(self) -> ClassicPlayer:
@@ -323,3 +585,7 @@ class ClassicGame:
     @property
     def is_over(self) -> bool:
         return self._is_over
+
+    @property
+    def log(self) -> 'GameLog':
+        return self._log
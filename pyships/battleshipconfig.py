@@ -8,6 +8,16 @@ BATTLESHIP_PATH = 'res/battleship.gif'
 PATROLBOAT_PATH = 'res/patrolboat.gif'
 SUBMARINE_PATH = 'res/submarine.gif'
 DESTROYER_PATH = 'res/destroyer.gif'
+SHIP_PATHS = (CARRIER_PATH, BATTLESHIP_PATH, PATROLBOAT_PATH, SUBMARINE_PATH, DESTROYER_PATH)
+
+# Build every rotation of the ship sprites when the game starts, so the
+# first rotation of a ship doesn't stall
+WARM_UP_SPRITES = True
+
+# Pre-decoded sprite bundle (see assetbundle.py), built on first run and
+# loaded in the background while the start menu shows
+USE_ASSET_BUNDLE = True
+ASSET_BUNDLE_DIR = 'res/bundle'
 
 # Canvas dimensions
 DEFAULT_WIDTH = 765
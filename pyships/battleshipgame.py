@@ -1,7 +1,6 @@
-from PIL import Image, ImageTk
 import tkinter
 
-from . import battleship
+from . import assetbundle, battleship
 from .battleshipconfig import *
 from .errortypes import (
     GameError, 
@@ -9,6 +8,7 @@ from .errortypes import (
     HitError, 
     TargetError
     )
+from .imageloader import instance as gImageLoader
 from .oceangridcanvas import OceanGridCanvas
 from .startmenucanvas import StartMenuCanvas
 from .targetgridcanvas import TargetGridCanvas
@@ -17,6 +17,8 @@ class BattleshipGame(tkinter.Tk):
     def __init__(self):
         super().__init__()
         self._game_in_progress = False
+        # Sprites load in the background while the start menu is up
+        self._asset_preload = assetbundle.preload_async(gImageLoader) if USE_ASSET_BUNDLE else None
 
         self._width = DEFAULT_WIDTH
         self._height = DEFAULT_HEIGHT
@@ -54,8 +56,12 @@ class BattleshipGame(tkinter.Tk):
         self._player1 = player1
         self._player2 = player2
         if self._player1 and self._player2:
+            if self._asset_preload:
+                self._asset_preload.join()
+                self._asset_preload = None
+            if WARM_UP_SPRITES:
+                gImageLoader.warm_up(SHIP_PATHS)
             
-            self._game = battleship.ClassicGame(self._player1, self._player2)
             self._ocean_canvases[self._player1] = OceanGridCanvas(self._gamecanvas_frame, self._player1, self._width, self._height, self._on_ships_are_placed)
             self._target_canvases[self._player1] = TargetGridCanvas(self._gamecanvas_frame, self._player1, self._width, self._height, self._on_shot_attempt)
 
@@ -99,16 +105,17 @@ class BattleshipGame(tkinter.Tk):
         if not self._placement_phase:
             self._swap_canvas()
 
-    def _on_shot_attempt(self, row: str, col: int) -> str:
+    def _on_shot_attempt(self, cell: int) -> str:
         # Player attempts to shoot using their target grid
         color = None
+        row, col = battleship.cell_location(cell)
         attacker = self._game.current_player
         if not self._game.is_over:
             hit_ship = None
             try:
                 # The shot is taken by the 'current player' which, if the turn is valid,
                 # causes the 'current player' to be the next player...
-                hit_ship = self._game.take_shot((row, col))
+                hit_ship = self._game.take_shot_cell(cell)
             except (GameError, BadLocationError,
                     HitError, TargetError) as e:
                 print(e)
@@ -151,6 +158,8 @@ class BattleshipGame(tkinter.Tk):
             self._gamecanvas.display()
             
         if self._player1.ships_are_placed() and self._player2.ships_are_placed():
+            # The game checks both fleets, so it starts once they are placed
+            self._game = battleship.ClassicGame(self._player1, self._player2)
             self._placement_phase = False
 
             self._info_text = self._TURN_TEXT.format(self._game.current_player.name)
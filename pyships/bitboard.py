@@ -0,0 +1,355 @@
+from .board import (
+    CLASSIC_BOARD,
+    Board,
+    RED,
+    mask_cells,
+    WHITE
+)
+from .errortypes import (
+    HitError,
+    ShipInWayError,
+    BadShotLocationError,
+    BadLocationError,
+    BadPegLocationError,
+    HasPegError
+    )
+from .placements import (
+    PLACE_OK,
+    PLACE_SHIP_IN_WAY,
+    PLACEMENT_ENDS,
+    PLACEMENT_ERRORS,
+    layout_placements,
+    placement_status,
+    placements
+)
+from .ships import Ship
+from .textrender import board_text
+
+# Bitboard versions of OceanGrid and TargetGrid. Every cell is one bit of an
+# int (bit index = row * columns + col), so occupancy, hits and misses are
+# single ints and overlap/sunk checks are AND/OR operations. The public
+# methods mirror OceanGrid and TargetGrid so they can be swapped in per game.
+#
+# Hits are resolved from the masks alone: a ship is sunk once its footprint
+# has no unhit cell, the fleet once the occupied cells have none. The Ship
+# objects are only told when they sink (Ship.sink), so until then their
+# part hit state is not kept up to date.
+
+# 1 << cell of every cell of a board, shared by all its grids so shots index
+# a tuple rather than build the bit. Boards above _BIT_TABLE_CELLS cells get
+# a _Bits instead, which builds it on each call and keeps nothing.
+_BIT_TABLE_CELLS = 1024
+_bit_tables = dict()
+
+class _Bits:
+    # A bit table look-alike, IndexError past the last cell like a tuple
+    __slots__ = ('_cells',)
+
+    def __init__(self, cells: int):
+        self._cells = cells
+
+    def __getitem__(self, cell: int) -> int:
+        if cell >= self._cells:
+            raise IndexError(cell)
+        return 1 << cell
+
+def _bits(board: Board) -> (int,):
+    # Callers reject negative cells themselves, a tuple would wrap them
+    if board.cells > _BIT_TABLE_CELLS:
+        return _Bits(board.cells)
+    bits = _bit_tables.get(board)
+    if bits is None:
+        bits = _bit_tables[board] = tuple(1 << cell for cell in range(board.cells))
+    return bits
+
+def _placement_status(start: int, end: int, length: int, board: Board) -> (int, (int,), int):
+    # placement_status with the cells as a mask too, 0 unless status is
+    # PLACE_OK. The classic board reads it from the placement index.
+    if board == CLASSIC_BOARD:
+        table = placements(length)
+        index = PLACEMENT_ENDS[length].get((start, end))
+        if index is not None:
+            cells, mask = table[index]
+            return PLACE_OK, cells, mask
+
+    status, cells = placement_status(start, end, length, board)
+    mask = 0
+    if status == PLACE_OK:
+        for cell in cells:
+            mask |= 1 << cell
+    return status, cells, mask
+
+def _placement(start: int, end: int, length: int, board: Board) -> ((int,), int):
+    # (cells, mask) of a placement, raising if it is not on the board
+    status, cells, mask = _placement_status(start, end, length, board)
+    if status != PLACE_OK:
+        raise PLACEMENT_ERRORS[status]()
+    return cells, mask
+
+class BitOceanGrid:
+    __slots__ = ('_board', '_bits', '_occupied', '_hits', '_misses', '_footprints', '_ships_at', '_ships_afloat')
+
+    def __init__(self, board: Board = None):
+        self._board = board if board is not None else CLASSIC_BOARD
+        self._bits = _bits(self._board)
+        # Cells covered by a ship part
+        self._occupied = 0
+        # Cells with a hit/miss peg
+        self._hits = 0
+        self._misses = 0
+        # Footprint mask of every placed ship
+        self._footprints = dict()
+        # Ship per occupied cell, needed to report which ship was hit
+        self._ships_at = dict()
+        # Placed ships that are not destroyed
+        self._ships_afloat = 0
+
+    def place(self, start: (str, int), end: (str, int), ship: Ship) -> None:
+        self.place_cell(self._board.cell_index(start), self._board.cell_index(end), ship)
+
+    def place_cell(self, start: int, end: int, ship: Ship) -> None:
+        status = self.try_place_cell(start, end, ship)
+        if status != PLACE_OK:
+            raise PLACEMENT_ERRORS[status]()
+
+    # Non-raising placement, see OceanGrid
+    def can_place(self, start: (str, int), end: (str, int), length: int) -> int:
+        return self.can_place_cell(self._board.cell_index(start), self._board.cell_index(end), length)
+
+    def can_place_cell(self, start: int, end: int, length: int) -> int:
+        status, cells, mask = _placement_status(start, end, length, self._board)
+        if status == PLACE_OK and self._occupied & mask:
+            return PLACE_SHIP_IN_WAY
+        return status
+
+    def try_place(self, start: (str, int), end: (str, int), ship: Ship) -> int:
+        return self.try_place_cell(self._board.cell_index(start), self._board.cell_index(end), ship)
+
+    def try_place_cell(self, start: int, end: int, ship: Ship) -> int:
+        status, cells, mask = _placement_status(start, end, ship.length, self._board)
+        if status != PLACE_OK:
+            return status
+        if self._occupied & mask:
+            return PLACE_SHIP_IN_WAY
+
+        ships_at = self._ships_at
+        for cell in cells:
+            ships_at[cell] = ship
+
+        self._occupied |= mask
+        self._footprints[ship] = mask
+        self._ships_afloat += 1
+        ship.place([self._board.cell_location(cell) for cell in cells])
+        return PLACE_OK
+
+    def place_fleet(self, ships: [Ship], layout: (int,)) -> None:
+        # All or nothing, see OceanGrid
+        status = self.try_place_fleet(ships, layout)
+        if status != PLACE_OK:
+            raise PLACEMENT_ERRORS[status]()
+
+    def try_place_fleet(self, ships: [Ship], layout: (int,)) -> int:
+        status, chosen, occupied = layout_placements(layout, [ship.length for ship in ships], self._board)
+        if status != PLACE_OK:
+            return status
+        if self._occupied & occupied:
+            return PLACE_SHIP_IN_WAY
+
+        ships_at = self._ships_at
+        for ship, (cells, mask) in zip(ships, chosen):
+            for cell in cells:
+                ships_at[cell] = ship
+            self._footprints[ship] = mask
+            ship.place([self._board.cell_location(cell) for cell in cells])
+        self._occupied |= occupied
+        self._ships_afloat += len(ships)
+        return PLACE_OK
+
+    def unplace(self, ship: Ship) -> None:
+        # TODO: Raise UnplaceError if part has been shot
+        mask = self._footprints.pop(ship)
+        self._occupied &= ~mask
+        for part in ship.parts:
+            del self._ships_at[self._board.cell_index(part.location)]
+
+        if not ship.is_destroyed:
+            self._ships_afloat -= 1
+        ship.unplace()
+
+    def shoot(self, location: (str, int)) -> bool:
+        return self.receive_shot_cell(self._board.cell_index(location)) is not None
+
+    def shoot_cell(self, cell: int) -> bool:
+        return self.receive_shot_cell(cell) is not None
+
+    def receive_shot(self, location: (str, int)) -> Ship:
+        return self.receive_shot_cell(self._board.cell_index(location))
+
+    def receive_shot_cell(self, cell: int) -> Ship:
+        # Shoot cell and return the ship that was hit (None on a miss). Only
+        # cells on the board hold a ship, so only misses need the bounds
+        # check, the bit table doing the upper half of it.
+        ships_at = self._ships_at
+        if cell not in ships_at:
+            if cell < 0:
+                raise BadShotLocationError()
+            try:
+                self._misses |= self._bits[cell]
+            except IndexError:
+                raise BadShotLocationError() from None
+            return None
+
+        ship = ships_at[cell]
+        bit = self._bits[cell]
+        hits = self._hits
+        if hits & bit:
+            raise HitError()
+        self._hits = hits = hits | bit
+        if not self._footprints[ship] & ~hits:
+            ship.sink()
+            self._ships_afloat -= 1
+        return ship
+
+    def at(self, location: (str, int)) -> Ship:
+        # Return the ship at location
+        return self.at_cell(self._board.cell_index(location))
+
+    def at_cell(self, cell: int) -> Ship:
+        ships_at = self._ships_at
+        if cell in ships_at:
+            return ships_at[cell]
+        if not 0 <= cell < self._board.cells:
+            raise BadLocationError()
+        return None
+
+    def is_sunk(self, ship: Ship) -> bool:
+        return not self._footprints[ship] & ~self._hits
+
+    def fleet_destroyed(self) -> bool:
+        return self._occupied & ~self._hits == 0
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def ships(self) -> [Ship]:
+        # Ships placed on the grid, in placement order
+        return list(self._footprints)
+
+    @property
+    def ships_afloat(self) -> int:
+        return self._ships_afloat
+
+    def peg_masks(self) -> (int, int):
+        # (hits, misses) as bitmasks of cell indices
+        return self._hits, self._misses
+
+    def peg_cells(self) -> ([int], [int]):
+        # (hit cells, miss cells) in ascending order
+        return mask_cells(self._hits), mask_cells(self._misses)
+
+    def ship_mask(self) -> int:
+        # Cells covered by a ship part as a bitmask of cell indices
+        return self._occupied
+
+    @property
+    def pegs(self) -> [[int]]:
+        # Built on demand for the canvases, the masks are the real state
+        columns = self._board.columns
+        pegs = [[None for c in range(columns)] for r in range(self._board.rows)]
+        for cell in range(self._board.cells):
+            bit = 1 << cell
+            if self._hits & bit:
+                pegs[cell // columns][cell % columns] = RED
+            elif self._misses & bit:
+                pegs[cell // columns][cell % columns] = WHITE
+
+        return pegs
+
+    def __str__(self):
+        return board_text(self)
+
+class BitTargetGrid:
+    __slots__ = ('_board', '_bits', '_pegged', '_hits', '_enemy_ships', '_sunk_ships')
+
+    def __init__(self, board: Board = None):
+        self._board = board if board is not None else CLASSIC_BOARD
+        self._bits = _bits(self._board)
+        # Cells with any peg and cells with a hit peg, the misses are the
+        # difference. One mask holding every peg lets a shot check for and
+        # set its peg with a single OR.
+        self._pegged = 0
+        self._hits = 0
+
+        # Cells of enemy destroyed ships
+        self._enemy_ships = 0
+        self._sunk_ships = []
+
+    def hit(self, location: (str, int)) -> None:
+        self.hit_cell(self._board.cell_index(location))
+
+    def hit_cell(self, cell: int) -> None:
+        self._hits |= self._peg(cell)
+
+    def miss(self, location: (str, int)) -> None:
+        self.miss_cell(self._board.cell_index(location))
+
+    def miss_cell(self, cell: int) -> None:
+        # Written out rather than calling _peg, most shots miss
+        if cell < 0:
+            raise BadPegLocationError()
+        try:
+            pegged = self._pegged | self._bits[cell]
+        except IndexError:
+            raise BadPegLocationError() from None
+        if pegged == self._pegged:
+            raise HasPegError()
+        self._pegged = pegged
+
+    def place_enemy(self, start: (str, int), end: (str, int), ship: Ship) -> None:
+        # Place enemy ship parts
+        self.place_enemy_cell(self._board.cell_index(start), self._board.cell_index(end), ship)
+
+    def place_enemy_cell(self, start: int, end: int, ship: Ship) -> None:
+        cells, mask = _placement(start, end, ship.length, self._board)
+        if self._enemy_ships & mask:
+            raise ShipInWayError()
+
+        self._enemy_ships |= mask
+        self._sunk_ships.append(ship)
+        ship.place([self._board.cell_location(cell) for cell in cells])
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def sunk_ships(self) -> [Ship]:
+        # Enemy ships placed with place_enemy, in the order they sank
+        return list(self._sunk_ships)
+
+    def peg_masks(self) -> (int, int):
+        # (hits, misses) as bitmasks of cell indices
+        return self._hits, self._pegged & ~self._hits
+
+    def ship_mask(self) -> int:
+        # Cells covered by sunk enemy ship parts as a bitmask of cell indices
+        return self._enemy_ships
+
+    def _peg(self, cell: int) -> int:
+        # Bit of cell after setting its peg in _pegged
+        if cell < 0:
+            raise BadPegLocationError()
+        try:
+            bit = self._bits[cell]
+        except IndexError:
+            raise BadPegLocationError() from None
+        pegged = self._pegged | bit
+        if pegged == self._pegged:
+            raise HasPegError()
+        self._pegged = pegged
+        return bit
+
+    def __str__(self):
+        return board_text(self)
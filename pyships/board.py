@@ -0,0 +1,101 @@
+# Board dimensions and location tables shared by every grid implementation
+ROWS = 10
+COLUMNS = 10
+ROW_NUMBERS = {'A':0, 'B': 1, 'C': 2, 'D': 3, 'E':4,
+                'F':5, 'G': 6, 'H': 7, 'I': 8, 'J': 9}
+ROW_LETTERS = {0:'A', 1:'B', 2:'C', 3:'D', 4:'E',
+                5:'F', 6:'G', 7:'H', 8:'I', 9:'J'}
+
+RED = _HIT = 1
+WHITE = _MISS = 0
+
+CELLS = ROWS * COLUMNS
+
+# Flat cell index (row * COLUMNS + col) for every valid (letter, int) location.
+# A failed lookup means the location is not on the board.
+CELL_INDEX = {(ROW_LETTERS[r], c): r * COLUMNS + c
+              for r in range(ROWS) for c in range(COLUMNS)}
+
+# Inverse of CELL_INDEX
+CELL_LOCATIONS = tuple((ROW_LETTERS[r], c) for r in range(ROWS) for c in range(COLUMNS))
+
+def cell_index(location: (str, int)) -> int:
+    # Flat cell index of a (letter, int) location, -1 if it is not on the board
+    try:
+        return CELL_INDEX.get(location, -1)
+    except TypeError:
+        return CELL_INDEX.get(tuple(location), -1)
+
+def cell_location(cell: int) -> (str, int):
+    # (letter, int) location of a flat cell index
+    return CELL_LOCATIONS[cell]
+
+def mask_cells(mask: int) -> [int]:
+    # Set bits of a cell bitmask in ascending order. Read from its binary
+    # text so a board-sized mask is walked once rather than once per set bit.
+    bits = bin(mask)[:1:-1]
+    cells = []
+    cell = bits.find('1')
+    while cell >= 0:
+        cells.append(cell)
+        cell = bits.find('1', cell + 1)
+    return cells
+
+def row_label(row: int) -> str:
+    # Spreadsheet style row letters: A..Z, AA..AZ, BA.. for boards over 26 rows
+    label = ''
+    row += 1
+    while row:
+        row, letter = divmod(row - 1, 26)
+        label = chr(ord('A') + letter) + label
+    return label
+
+class Board:
+    # Dimensions of a game board. The classic 10x10 board is CLASSIC_BOARD;
+    # other sizes can be passed to the grids, players and ClassicGame.
+    __slots__ = ('rows', 'columns', 'cells', 'row_numbers', 'row_letters')
+
+    def __init__(self, rows: int = ROWS, columns: int = COLUMNS):
+        if rows < 1 or columns < 1:
+            raise ValueError('Board must have at least one row and column')
+        self.rows = rows
+        self.columns = columns
+        self.cells = rows * columns
+        # Row labels are needed for the (letter, int) API, they grow with the
+        # number of rows only
+        self.row_letters = [row_label(r) for r in range(rows)]
+        self.row_numbers = {letter: r for r, letter in enumerate(self.row_letters)}
+
+    def cell_index(self, location: (str, int)) -> int:
+        # Flat cell index of a (letter, int) location, -1 if it is not on the board
+        row = self.row_numbers.get(location[0])
+        col = location[1]
+        if row is None or not 0 <= col < self.columns:
+            return -1
+        return row * self.columns + col
+
+    def cell_location(self, cell: int) -> (str, int):
+        row, col = divmod(cell, self.columns)
+        return (self.row_letters[row], col)
+
+    def __eq__(self, other):
+        return (isinstance(other, Board)
+                and self.rows == other.rows and self.columns == other.columns)
+
+    def __hash__(self):
+        return hash((self.rows, self.columns))
+
+    def __repr__(self):
+        return 'Board({}, {})'.format(self.rows, self.columns)
+
+class _ClassicBoard(Board):
+    # The default board, resolved through the precomputed location tables
+    __slots__ = ()
+
+    def cell_index(self, location: (str, int)) -> int:
+        return cell_index(location)
+
+    def cell_location(self, cell: int) -> (str, int):
+        return CELL_LOCATIONS[cell]
+
+CLASSIC_BOARD = _ClassicBoard(ROWS, COLUMNS)
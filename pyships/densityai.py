@@ -0,0 +1,134 @@
+import random
+
+from .board import CELLS, CLASSIC_BOARD
+from .fleetgen import FLEET_LENGTHS
+from .placements import PLACEMENTS, CELL_PLACEMENTS, placement_cells
+
+# Hunt/target computer player for the classic board.
+#
+# The heat map counts, for every cell, the placements of each remaining
+# ship that agree with what has been seen so far: no placement covers a
+# miss or a sunk ship. A miss or a sinking only kills the placements that
+# cover the changed cells (CELL_PLACEMENTS), so a shot costs a few dozen
+# updates instead of a rebuild of the board.
+#
+# While there are hits that do not belong to a sunk ship the AI targets:
+# only the live placements through those hits are counted, each once per
+# hit it covers. Otherwise it hunts on the whole heat map.
+
+class DensityAI:
+    __slots__ = ('_rng', '_remaining', '_alive', '_density', '_shot', '_open_hits')
+
+    def __init__(self, seed: int = None, lengths: (int,) = FLEET_LENGTHS):
+        self._rng = random.Random(seed)
+        # Number of ships left per length
+        self._remaining = dict()
+        for length in lengths:
+            self._remaining[length] = self._remaining.get(length, 0) + 1
+        # Live (not ruled out) flag of every placement per length
+        self._alive = {length: bytearray(b'\x01') * len(PLACEMENTS[length])
+                       for length in self._remaining}
+        # Weighted count of live placements per cell
+        self._density = [0] * CELLS
+        for length, count in self._remaining.items():
+            for cells, mask in PLACEMENTS[length]:
+                for cell in cells:
+                    self._density[cell] += count
+        # Cells already fired at
+        self._shot = 0
+        # Hits not yet part of a sunk ship
+        self._open_hits = []
+
+    @property
+    def density(self) -> [int]:
+        # Hunt heat map, indexed by cell
+        return self._density
+
+    def choose_cell(self) -> int:
+        # Cell to fire at next
+        if self._open_hits:
+            scores = self._target_scores()
+            if scores:
+                return self._best(scores.items())
+
+        shot = self._shot
+        density = self._density
+        return self._best((cell, density[cell]) for cell in range(CELLS) if not shot >> cell & 1)
+
+    def observe(self, result: 'ShotResult') -> None:
+        # Update the map from the result of a shot this player fired
+        self.observe_cell(result.cell, result.is_hit, result.sunk_ship)
+
+    def observe_cell(self, cell: int, is_hit: bool, sunk_ship: 'Ship' = None) -> None:
+        self._shot |= 1 << cell
+        if not is_hit:
+            self._rule_out(cell)
+            return
+
+        self._open_hits.append(cell)
+        if sunk_ship is not None:
+            length = sunk_ship.length
+            start = CLASSIC_BOARD.cell_index(sunk_ship.start())
+            end = CLASSIC_BOARD.cell_index(sunk_ship.end())
+            cells = placement_cells(start, end, length)
+
+            # The ship is gone: take its weight off the map, then no other
+            # ship can cover its cells
+            self._remaining[length] -= 1
+            alive = self._alive[length]
+            for index, (placement, mask) in enumerate(PLACEMENTS[length]):
+                if alive[index]:
+                    for c in placement:
+                        self._density[c] -= 1
+            for c in cells:
+                self._rule_out(c)
+                if c in self._open_hits:
+                    self._open_hits.remove(c)
+
+    def play_turn(self, game: 'ClassicGame') -> 'ShotResult':
+        # Fire the chosen cell as the game's current player
+        result = game.fire_cell(self.choose_cell())
+        self.observe(result)
+        return result
+
+    def _rule_out(self, cell: int) -> None:
+        # Kill every live placement covering cell
+        density = self._density
+        for length, count in self._remaining.items():
+            alive = self._alive[length]
+            table = PLACEMENTS[length]
+            for index in CELL_PLACEMENTS[length][cell]:
+                if alive[index]:
+                    alive[index] = 0
+                    if count:
+                        for c in table[index][0]:
+                            density[c] -= count
+
+    def _target_scores(self) -> {int: int}:
+        # Live placements through the open hits, scored on unshot cells
+        shot = self._shot
+        scores = dict()
+        for hit in self._open_hits:
+            for length, count in self._remaining.items():
+                if not count:
+                    continue
+                alive = self._alive[length]
+                table = PLACEMENTS[length]
+                for index in CELL_PLACEMENTS[length][hit]:
+                    if alive[index]:
+                        for c in table[index][0]:
+                            if not shot >> c & 1:
+                                scores[c] = scores.get(c, 0) + count
+        return scores
+
+    def _best(self, scored: '[(int, int)]') -> int:
+        # Highest scoring cell, ties broken at random
+        best = []
+        best_score = -1
+        for cell, score in scored:
+            if score > best_score:
+                best = [cell]
+                best_score = score
+            elif score == best_score:
+                best.append(cell)
+        return self._rng.choice(best)
@@ -0,0 +1,85 @@
+import random
+
+from .board import ROWS, COLUMNS, CELLS, CELL_LOCATIONS
+from .placements import PLACEMENTS
+from .ships import FLEET
+
+# Random fleet layouts, uniformly distributed over all valid layouts.
+#
+# A layout is a tuple with one index into PLACEMENTS[length] per ship of
+# FLEET, in FLEET order. Layouts are drawn by picking every ship's placement
+# uniformly and starting over as soon as one overlaps an earlier ship, which
+# is rejection sampling on the bitmasks: no ship objects are built and no
+# placement errors are raised.
+
+FLEET_LENGTHS = tuple(ship_type().length for ship_type in FLEET)
+
+def random_layout(rng: random.Random, lengths: (int,) = FLEET_LENGTHS) -> (int,):
+    tables = [PLACEMENTS[length] for length in lengths]
+    while True:
+        occupied = 0
+        layout = []
+        for table in tables:
+            index = rng.randrange(len(table))
+            mask = table[index][1]
+            if occupied & mask:
+                break
+            occupied |= mask
+            layout.append(index)
+        else:
+            return tuple(layout)
+
+def generate_layouts(count: int = None, seed: int = None, lengths: (int,) = FLEET_LENGTHS) -> '[(int,)]':
+    # Yield count layouts (forever if count is None) from a seeded generator
+    rng = random.Random(seed)
+    generated = 0
+    while count is None or generated < count:
+        yield random_layout(rng, lengths)
+        generated += 1
+
+def layout_locations(layout: (int,), lengths: (int,) = FLEET_LENGTHS) -> '[((str, int), (str, int))]':
+    # (start, end) location of every ship in a layout
+    locations = []
+    for index, length in zip(layout, lengths):
+        cells = PLACEMENTS[length][index][0]
+        locations.append((CELL_LOCATIONS[cells[0]], CELL_LOCATIONS[cells[-1]]))
+    return locations
+
+def generate_fleet(seed: int = None, name: str = 'Player', backend: str = 'list') -> 'ClassicPlayer':
+    # ClassicPlayer with a random fleet already placed on its ocean grid
+    return layout_fleet(random_layout(random.Random(seed)), name, backend)
+
+def layout_fleet(layout: (int,), name: str = 'Player', backend: str = 'list') -> 'ClassicPlayer':
+    # ClassicPlayer with the FLEET placed as in layout
+    from .battleship import ClassicPlayer
+
+    return ClassicPlayer.from_layout(layout, name, backend)
+
+def generate_layout_array(count: int, seed: int = None, lengths: (int,) = FLEET_LENGTHS) -> 'numpy.ndarray':
+    # (count, ROWS, COLUMNS) int8 ship-id grids (0 open water, k the k-th
+    # ship of lengths), in the format used by BatchGame. Requires NumPy.
+    import numpy
+
+    rng = numpy.random.default_rng(seed)
+    # Cell occupancy of every placement, one (placements, CELLS) table per ship
+    tables = []
+    for length in lengths:
+        table = numpy.zeros((len(PLACEMENTS[length]), CELLS), dtype=numpy.int8)
+        for index, (cells, mask) in enumerate(PLACEMENTS[length]):
+            table[index, list(cells)] = 1
+        tables.append(table)
+
+    grids = numpy.zeros((count, CELLS), dtype=numpy.int8)
+    todo = numpy.arange(count)
+    while todo.size:
+        # Draw every ship at once, keep the rows where no two ships overlap
+        choices = [rng.integers(len(table), size=todo.size) for table in tables]
+        occupancy = sum(table[choice] for table, choice in zip(tables, choices))
+        valid = occupancy.max(axis=1) <= 1
+
+        done = todo[valid]
+        for ship_id, (table, choice) in enumerate(zip(tables, choices), 1):
+            grids[done] += table[choice[valid]] * numpy.int8(ship_id)
+        todo = todo[~valid]
+
+    return grids.reshape(count, ROWS, COLUMNS)
@@ -0,0 +1,144 @@
+import json
+
+# Append-only event log of a ClassicGame and a replay engine over it.
+#
+# Events are tuples starting with their kind:
+#   (PLACE, player, ship name, start cell, end cell)  fleet at the first shot
+#   (SHOT, turn, player, cell, is_hit, sunk ship name or None)
+#   (GAME_OVER, turn, winner)
+# Players are 0 (player1) or 1 (player2). Every keyframe_interval turns the
+# log also keeps a ClassicGame.to_bytes() snapshot, so a replay can seek to
+# any turn by decoding the nearest keyframe and re-running only the shots
+# after it. Snapshots switch to cell lists once those are smaller than peg
+# bitmaps, so a keyframe of a large sparse board grows with the shots taken
+# rather than with the board area.
+
+PLACE = 'place'
+SHOT = 'shot'
+GAME_OVER = 'game_over'
+_KEYFRAME = 'keyframe'
+
+class GameLog:
+    def __init__(self, keyframe_interval: int = 16):
+        if keyframe_interval < 1:
+            raise ValueError('keyframe_interval must be at least 1')
+        self.keyframe_interval = keyframe_interval
+        self._events = []
+        # Cell shot on every turn, indexed by turn
+        self._shots = []
+        # (turn, snapshot) in turn order
+        self._keyframes = []
+
+    @property
+    def events(self) -> [tuple]:
+        return self._events
+
+    @property
+    def turns(self) -> int:
+        return len(self._shots)
+
+    @property
+    def keyframes(self) -> [(int, bytes)]:
+        return self._keyframes
+
+    def record_start(self, game: 'ClassicGame') -> None:
+        # Fleets are only final once play starts, so ClassicGame calls this
+        # just before the first shot. Ships come from each ocean grid, see
+        # ClassicPlayer.fleet.
+        for p, player in enumerate((game._player1, game._player2)):
+            for name, ship in player.fleet():
+                if ship is not None and ship.is_placed:
+                    self._events.append((PLACE, p, name,
+                                         game.board.cell_index(ship.start()),
+                                         game.board.cell_index(ship.end())))
+        self._keyframes.append((0, game.to_bytes(include_names=True)))
+
+    def record_shot(self, game: 'ClassicGame', player: int, result: 'ShotResult') -> None:
+        # Called by ClassicGame after every shot it accepted
+        turn = len(self._shots)
+        sunk_name = type(result.sunk_ship).__name__ if result.sunk_ship else None
+        self._events.append((SHOT, turn, player, result.cell, result.is_hit, sunk_name))
+        self._shots.append(result.cell)
+
+        if result.is_game_over:
+            self._events.append((GAME_OVER, turn, player))
+        if (turn + 1) % self.keyframe_interval == 0:
+            self._keyframes.append((turn + 1, game.to_bytes(include_names=True)))
+
+    def write(self, fp) -> None:
+        # One JSON array per line: the events, then the keyframes as hex
+        for event in self._events:
+            fp.write(json.dumps(event) + '\n')
+        for turn, snapshot in self._keyframes:
+            fp.write(json.dumps((_KEYFRAME, turn, snapshot.hex())) + '\n')
+
+    @classmethod
+    def read(cls, fp, keyframe_interval: int = 16) -> 'GameLog':
+        log = cls(keyframe_interval)
+        for line in fp:
+            if not line.strip():
+                continue
+            event = tuple(json.loads(line))
+            if event[0] == _KEYFRAME:
+                log._keyframes.append((event[1], bytes.fromhex(event[2])))
+            else:
+                log._events.append(event)
+                if event[0] == SHOT:
+                    log._shots.append(event[3])
+
+        log._keyframes.sort()
+        return log
+
+class Replay:
+    # Rebuilds the game position after any number of turns of a GameLog
+    def __init__(self, log: GameLog, backend: str = 'list'):
+        if not log.keyframes:
+            raise ValueError('Log has no starting keyframe')
+        self._log = log
+        self._backend = backend
+
+    @property
+    def turns(self) -> int:
+        return self._log.turns
+
+    def state_at(self, turn: int) -> 'ClassicGame':
+        # Game as it was after `turn` shots
+        from .battleship import ClassicGame
+
+        if not 0 <= turn <= self._log.turns:
+            raise ValueError('Turn {} is not in the log (0..{})'.format(turn, self._log.turns))
+
+        keyframe_turn, snapshot = self._nearest_keyframe(turn)
+        game = ClassicGame.from_bytes(snapshot, backend=self._backend)
+        for cell in self._log._shots[keyframe_turn:turn]:
+            game.fire_cell(cell)
+
+        return game
+
+    def verify(self) -> int:
+        # Re-run the whole game from its start and compare every shot with
+        # the logged result. Returns the first turn that differs, or None.
+        from .battleship import ClassicGame
+
+        game = ClassicGame.from_bytes(self._log.keyframes[0][1], backend=self._backend)
+        for event in self._log.events:
+            if event[0] != SHOT:
+                continue
+            kind, turn, player, cell, is_hit, sunk_name = event
+            result = game.fire_cell(cell)
+            sunk = type(result.sunk_ship).__name__ if result.sunk_ship else None
+            if result.is_hit != is_hit or sunk != sunk_name:
+                return turn
+
+        return None
+
+    def _nearest_keyframe(self, turn: int) -> (int, bytes):
+        keyframes = self._log.keyframes
+        low, high = 0, len(keyframes) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if keyframes[middle][0] <= turn:
+                low = middle
+            else:
+                high = middle - 1
+        return keyframes[low]
@@ -1,14 +1,84 @@
+import threading
+from collections import OrderedDict
+
 from PIL import Image, ImageTk
 
+# Process-wide image cache. load() keeps every decoded source image, and
+# sprite variants (rotated and/or scaled, with their PhotoImage) are kept per
+# (path, angle, scale) in a bounded LRU shared by every canvas. PhotoImages
+# need a Tk root, so they are only made on first request; warm_up() after the
+# root exists makes the first rotation of a ship free.
+#
+# assetbundle.preload_async() adds images from a worker thread while the Tk
+# thread may already be reading, so the caches are only touched under a lock.
+# PhotoImages are still made on the calling thread, which must be Tk's.
 class ImageLoader:
-    def __init__(self):
+    def __init__(self, max_sprites: int = 64):
         self._cache = dict()
+        # (path, angle, scale) -> [image, photo or None], least recent first
+        self._sprites = OrderedDict()
+        self.max_sprites = max_sprites
+        # Reentrant as _sprite loads under it
+        self._lock = threading.RLock()
 
     def load(self, file_path: str) -> Image:
-        if file_path not in self._cache:
-            self._cache[file_path] = Image.open(file_path)
+        with self._lock:
+            if file_path not in self._cache:
+                # Decode now so the file is closed straight away
+                with Image.open(file_path) as image:
+                    image.load()
+                    self._cache[file_path] = image.copy()
+
+            return self._cache[file_path]
+
+    def add(self, file_path: str, image: Image, angle: int = 0) -> None:
+        # Use an already decoded (e.g. bundled) image for a path/rotation
+        with self._lock:
+            if angle % 360 == 0:
+                self._cache[file_path] = image
+            self._sprites[(file_path, angle % 360, 1.0)] = [image, None]
+            while len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+
+    def image(self, file_path: str, angle: int = 0, scale: float = 1.0) -> Image:
+        # Source image rotated counterclockwise by angle degrees and scaled
+        return self._sprite(file_path, angle, scale)[0]
+
+    def photo(self, file_path: str, angle: int = 0, scale: float = 1.0) -> ImageTk.PhotoImage:
+        sprite = self._sprite(file_path, angle, scale)
+        if sprite[1] is None:
+            sprite[1] = ImageTk.PhotoImage(sprite[0])
+        return sprite[1]
+
+    def warm_up(self, file_paths: [str], angles: (int,) = (0, 90, 180, 270), scales: (float,) = (1.0,),
+                photos: bool = True) -> None:
+        # Build the variants up front, PhotoImages too unless photos is False
+        for file_path in file_paths:
+            for angle in angles:
+                for scale in scales:
+                    if photos:
+                        self.photo(file_path, angle, scale)
+                    else:
+                        self.image(file_path, angle, scale)
+
+    def _sprite(self, file_path: str, angle: int, scale: float) -> list:
+        key = (file_path, angle % 360, scale)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                return sprite
+
+            image = self.load(file_path)
+            if scale != 1.0:
+                image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))))
+            if key[1]:
+                image = image.rotate(key[1], expand=True)
 
-        return self._cache[file_path]
+            sprite = [image, None]
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+            return sprite
 
 instance = ImageLoader()
-      
\ No newline at end of file
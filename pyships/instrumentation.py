@@ -0,0 +1,228 @@
+import bisect
+import os
+import threading
+import time
+
+from .battleship import ClassicGame, ClassicPlayer, OceanGrid, SparseOceanGrid
+from .bitboard import BitOceanGrid
+from .placements import PLACE_OK
+
+# Optional call counters and latency histograms for the engine hot paths.
+#
+# enable() wraps the instrumented methods in place and disable() puts the
+# originals back, so while instrumentation is off the engine runs exactly
+# the uninstrumented code. Every wrapped call is timed into a histogram
+# (its count is the call counter) and calls that raise are counted
+# separately, as are placements that return a status other than PLACE_OK.
+# Finished games also record their length in turns.
+#
+# The metrics can be read as Prometheus text exposition, served over HTTP
+# with serve() or written to a file every few seconds with dump_every().
+# Both read from their own thread while games record, so Metrics guards its
+# dicts with a lock. Histogram.observe is left unlocked on the hot path, an
+# exposition may be off by the calls in flight.
+
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+TURN_BUCKETS = (20, 40, 60, 80, 100, 120, 140, 160, 180, 200)
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: (float,)):
+        self.bounds = bounds
+        # One count per bound plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    def __init__(self):
+        # (name, labels) -> Histogram / int
+        self.histograms = dict()
+        self.counters = dict()
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, labels: str = '', bounds: (float,) = LATENCY_BUCKETS) -> Histogram:
+        key = (name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(bounds)
+            return self.histograms[key]
+
+    def increment(self, name: str, labels: str = '') -> None:
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            counters = list(self.counters.items())
+            histograms = list(self.histograms.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(counters):
+            if name not in typed:
+                lines.append('# TYPE {} counter'.format(name))
+                typed.add(name)
+            lines.append('{}{} {}'.format(name, '{' + labels + '}' if labels else '', value))
+
+        for (name, labels), histogram in sorted(histograms, key=lambda item: item[0]):
+            if name not in typed:
+                lines.append('# TYPE {} histogram'.format(name))
+                typed.add(name)
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append('{}_bucket{{{}le="{}"}} {}'.format(name, prefix, bound, cumulative))
+            suffix = '{' + labels + '}' if labels else ''
+            lines.append('{}_sum{} {}'.format(name, suffix, histogram.sum))
+            lines.append('{}_count{} {}'.format(name, suffix, histogram.count))
+
+        return '\n'.join(lines) + '\n'
+
+# The metrics being recorded into, None while disabled
+metrics = None
+_originals = []
+
+def _timed(function: 'callable', name: str, labels: str, registry: Metrics,
+           is_status: bool = False) -> 'callable':
+    # With is_status the function returns a PLACE_* status, anything but
+    # PLACE_OK is counted as an error like a raise
+    histogram = registry.histogram(name, labels)
+    errors = name.replace('_seconds', '_errors_total')
+    clock = time.perf_counter
+
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            registry.increment(errors, labels)
+            raise
+        finally:
+            histogram.observe(clock() - start)
+        if is_status and result != PLACE_OK:
+            registry.increment(errors, labels)
+        return result
+
+    timed.__wrapped__ = function
+    timed.__name__ = function.__name__
+    return timed
+
+def _game_length(fire_cell: 'callable', registry: Metrics) -> 'callable':
+    turns = registry.histogram('pyships_game_turns', bounds=TURN_BUCKETS)
+
+    def fire_cell_counting_turns(game: ClassicGame, cell: int) -> 'ShotResult':
+        result = fire_cell(game, cell)
+        if result.is_game_over:
+            shots = 0
+            for player in (game._player1, game._player2):
+                hits, misses = player.ocean_grid.peg_masks()
+                shots += bin(hits | misses).count('1')
+            turns.observe(shots)
+        return result
+
+    fire_cell_counting_turns.__wrapped__ = fire_cell
+    fire_cell_counting_turns.__name__ = fire_cell.__name__
+    return fire_cell_counting_turns
+
+def _patch(owner: type, attribute: str, replacement: 'callable') -> None:
+    # An inherited attribute is recorded as None and deleted again by disable
+    _originals.append((owner, attribute, owner.__dict__.get(attribute)))
+    setattr(owner, attribute, replacement)
+
+def enable(registry: Metrics = None) -> Metrics:
+    # Start recording into registry (a new Metrics if None) and return it
+    global metrics
+    if metrics is not None:
+        disable()
+    registry = registry if registry is not None else Metrics()
+
+    # Every shot goes through fire_cell, every grid shot through
+    # receive_shot_cell and every single ship placement through
+    # try_place_cell (place_cell calls it), whatever entry point the caller
+    # used. Whole fleets go through try_place_fleet.
+    shot = _timed(_game_length(ClassicGame.fire_cell, registry), 'pyships_game_shot_seconds', '', registry)
+    _patch(ClassicGame, 'fire_cell', shot)
+    # SparseOceanGrid inherits the OceanGrid methods, so it gets wrappers of
+    # its own to keep its label. The originals are all read before anything
+    # is patched so no wrapper wraps another.
+    grid_types = (OceanGrid, SparseOceanGrid, BitOceanGrid)
+    originals = [(grid_type, grid_type.try_place_cell, grid_type.try_place_fleet, grid_type.receive_shot_cell)
+                 for grid_type in grid_types]
+    for grid_type, try_place_cell, try_place_fleet, receive_shot_cell in originals:
+        labels = 'grid="{}"'.format(grid_type.__name__)
+        _patch(grid_type, 'try_place_cell',
+               _timed(try_place_cell, 'pyships_ocean_place_seconds', labels, registry, True))
+        _patch(grid_type, 'try_place_fleet',
+               _timed(try_place_fleet, 'pyships_ocean_place_fleet_seconds', labels, registry, True))
+        _patch(grid_type, 'receive_shot_cell',
+               _timed(receive_shot_cell, 'pyships_ocean_shot_seconds', labels, registry))
+    _patch(ClassicPlayer, 'ships_are_destroyed',
+           _timed(ClassicPlayer.ships_are_destroyed, 'pyships_ships_are_destroyed_seconds', '', registry))
+
+    metrics = registry
+    return registry
+
+def disable() -> None:
+    # Put the original methods back
+    global metrics
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        if original is None:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+    metrics = None
+
+def serve(port: int = 9464, host: str = '127.0.0.1') -> 'http.server.HTTPServer':
+    # Serve the enabled metrics at http://host:port/metrics from a daemon
+    # thread. Call shutdown() on the returned server to stop it.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = (metrics.prometheus_text() if metrics is not None else '').encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def dump(path: str) -> None:
+    # Write the enabled metrics to path, replacing it in one step
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as out:
+        out.write(metrics.prometheus_text() if metrics is not None else '')
+    os.replace(temporary, path)
+
+def dump_every(path: str, interval: float = 10.0) -> threading.Event:
+    # dump() from a daemon thread every interval seconds until the returned
+    # event is set
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(interval):
+            dump(path)
+        dump(path)
+
+    threading.Thread(target=loop, daemon=True).start()
+    return stop
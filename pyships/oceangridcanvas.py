@@ -1,12 +1,11 @@
-from PIL import Image, ImageTk
+from PIL import ImageTk
+import time
 import tkinter
 
 from . import battleship
 from .battleshipconfig import *
 from .errortypes import BadLocationError, PlacementError
 from .gamecanvas import GameCanvas
-from .targetgridcanvas import TargetGridCanvas
-from .startmenucanvas import StartMenuCanvas
 from .imageloader import instance as gImageLoader
 from .pegsprite import PegSprite
 
@@ -28,38 +27,18 @@ class OceanGridCanvas(GameCanvas):
         self._ocean_grid_photo = ImageTk.PhotoImage(self._ocean_grid_img)
         self._ocean_grid_id = None
 
-        carrier_img = gImageLoader.load(CARRIER_PATH)
-        self._carrier_img = carrier_img
-
-        battleship_img = gImageLoader.load(BATTLESHIP_PATH)
-        self._battleship_img = battleship_img
-
-        destroyer_img = gImageLoader.load(DESTROYER_PATH)
-        self._destroyer_img = destroyer_img
-
-        patrolboat_img = gImageLoader.load(PATROLBOAT_PATH)
-        self._patrolboat_img = patrolboat_img
-
-        submarine_img = gImageLoader.load(SUBMARINE_PATH)
-        self._submarine_img = submarine_img
+        # Ship sprites come rotated from the shared image loader cache
+        self._ship_paths = {battleship.Carrier.__name__: CARRIER_PATH,
+                            battleship.BattleShip.__name__: BATTLESHIP_PATH,
+                            battleship.Destroyer.__name__: DESTROYER_PATH,
+                            battleship.Submarine.__name__: SUBMARINE_PATH,
+                            battleship.PatrolBoat.__name__: PATROLBOAT_PATH}
 
         # Pegs to show enemy moves / hits
         self._pegs = [[PegSprite() for _ in range(battleship.COLUMNS)] for _ in range(battleship.ROWS)]
-
-        # Images to be manipulated and turned into Photos
-        self._ship_imgs = {battleship.Carrier.__name__: {0: self._carrier_img, 90: None, 180: None, 270: None, 360: None},
-                           battleship.BattleShip.__name__: {0: self._battleship_img, 90: None, 180: None, 270: None, 360: None},
-                           battleship.Destroyer.__name__: {0: self._destroyer_img, 90: None, 180: None, 270: None, 360: None},
-                           battleship.Submarine.__name__: {0: self._submarine_img, 90: None, 180: None, 270: None, 360: None},
-                           battleship.PatrolBoat.__name__: {0: self._patrolboat_img, 90: None, 180: None, 270: None, 360: None}}
-
-        # Photos passed into create_image functions
-        self._ship_photos = {battleship.Carrier.__name__: {0:ImageTk.PhotoImage(self._carrier_img),90: None, 180: None, 270: None, 360: None},
-                             battleship.BattleShip.__name__: {0: ImageTk.PhotoImage(self._battleship_img), 90: None, 180: None, 270: None, 360: None},
-                             battleship.Destroyer.__name__: {0: ImageTk.PhotoImage(self._destroyer_img), 90: None, 180: None, 270: None, 360: None},
-                             battleship.Submarine.__name__: {0: ImageTk.PhotoImage(self._submarine_img), 90: None, 180: None, 270: None, 360: None},
-                             battleship.PatrolBoat.__name__: {0:ImageTk.PhotoImage(self._patrolboat_img), 90: None, 180: None, 270: None, 360: None}}
-
+        # Hit and miss cells (bitmasks) the pegs were last drawn for
+        self._rendered_hits = 0
+        self._rendered_misses = 0
 
         self._mouse_btn1_down = False
         self.bind('<Button-1>', self._on_mouse_btn1_down)
@@ -79,6 +58,13 @@ class OceanGridCanvas(GameCanvas):
         self._selected_ship_is_vertical = True
         self._selected_ship_degree = 0
 
+        # Dragging: motion events only record the latest position and at most
+        # one sprite move per frame is scheduled
+        self._DRAG_FRAME_MS = 16
+        self._drag_job = None
+        self._drag_position = None
+        self._last_drag_update = 0.0
+
     def display(self) -> None:
         print('Ocean should display')
         self._start()
@@ -88,29 +74,38 @@ class OceanGridCanvas(GameCanvas):
     def hide(self) -> None:
         self.pack_forget()
 
-    # sets peg colors depending on board state and redraws
+    # draws the pegs the player's ocean grid gained since the last call
     def on_hit(self) -> None:
+        hits, misses = self._player.ocean_grid.peg_masks()
+        new_hits = hits & ~self._rendered_hits
+        new_misses = misses & ~self._rendered_misses
+
+        for pegged, color in ((new_hits, PEG_HIT), (new_misses, PEG_MISS)):
+            while pegged:
+                low = pegged & -pegged
+                cell = low.bit_length() - 1
+                pegged ^= low
+                self._draw_peg(cell // battleship.COLUMNS, cell % battleship.COLUMNS, color)
+
+        self._rendered_hits = hits
+        self._rendered_misses = misses
+
+    # creates the oval for a peg, or recolors it if it has one
+    def _draw_peg(self, r: int, c: int, color: str) -> None:
         x_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.COLUMNS
         y_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.ROWS
 
-        # set the PegSprite location, color for every peg
-        for r in range(battleship.ROWS):
-            for c in range(battleship.COLUMNS):
-                peg = self._pegs[r][c]
-                if self._player.ocean_grid.pegs[r][c] == battleship.RED:
-                    peg.color = PEG_HIT
-                else:
-                    peg.color = PEG_MISS
-
-                peg.x1 = c * x_spacing + DEFAULT_HEADER_WIDTH + DEFAULT_PEG_SIZE
-                peg.y1 = r * y_spacing + DEFAULT_HEADER_HEIGHT + DEFAULT_PEG_SIZE
-                peg.x2 = (c + 1) * x_spacing + DEFAULT_HEADER_WIDTH - DEFAULT_PEG_SIZE
-                peg.y2 = (r + 1) * y_spacing + DEFAULT_HEADER_HEIGHT - DEFAULT_PEG_SIZE
+        peg = self._pegs[r][c]
+        peg.color = color
+        if peg.id:
+            self.itemconfigure(peg.id, fill=peg.color)
+            return
 
-                peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color)
-                self._pegs[r][c] = peg
-                    
-        self._redraw()
+        peg.x1 = c * x_spacing + DEFAULT_HEADER_WIDTH + DEFAULT_PEG_SIZE
+        peg.y1 = r * y_spacing + DEFAULT_HEADER_HEIGHT + DEFAULT_PEG_SIZE
+        peg.x2 = (c + 1) * x_spacing + DEFAULT_HEADER_WIDTH - DEFAULT_PEG_SIZE
+        peg.y2 = (r + 1) * y_spacing + DEFAULT_HEADER_HEIGHT - DEFAULT_PEG_SIZE
+        peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color, tags='peg')
 
     def _start(self) -> None:
         #self.delete(self._click_text_id)
@@ -131,12 +126,10 @@ class OceanGridCanvas(GameCanvas):
             
 
     def _redraw(self) -> None:
-        # Redraw ships ( and later pegs )
-        if self._ocean_grid_id:
-            self.delete(self._ocean_grid_id)
-            
-        self._ocean_grid_id = self.create_image((round(self._width/2), round(self._height/2)),
-                                                image=self._ocean_grid_photo, anchor='center')
+        # Redraw ships; the board image and pegs are drawn once and kept
+        if not self._ocean_grid_id:
+            self._ocean_grid_id = self.create_image((round(self._width/2), round(self._height/2)),
+                                                    image=self._ocean_grid_photo, anchor='center')
 
         if self._confirm_text_id:
             self.delete(self._confirm_text_id)
@@ -156,14 +149,9 @@ class OceanGridCanvas(GameCanvas):
                         image=sprite.photo, 
                         anchor="center")
 
-        for r in range(battleship.ROWS):
-            for c in range(battleship.COLUMNS):
-                if self._player.ocean_grid.pegs[r][c] != None:
-                    peg = self._pegs[r][c]
-                    if peg.id:
-                        self.delete(peg.id)  
-
-                    peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color) 
+        # pegs stay above the ship images
+        self.tag_raise('peg')
+        self.on_hit()
     
     def _on_mouse_btn1_down(self, event: tkinter.Event) -> None:
         self._mouse_btn1_down = True
@@ -192,8 +180,8 @@ class OceanGridCanvas(GameCanvas):
                     selected_sprite.x = event.x
                     selected_sprite.y = event.y
                     selected_sprite.degree = self._selected_ship_degree
-                    selected_sprite.image = self._ship_imgs[self._selected_ship_type][ROTATION_DEGREE]
-                    selected_sprite.photo = self._ship_photos[self._selected_ship_type][ROTATION_DEGREE]
+                    selected_sprite.image = gImageLoader.image(self._ship_paths[self._selected_ship_type], ROTATION_DEGREE)
+                    selected_sprite.photo = gImageLoader.photo(self._ship_paths[self._selected_ship_type], ROTATION_DEGREE)
                     selected_sprite.id = self.create_image(
                         (selected_sprite.x, selected_sprite.y),
                         image=selected_sprite.photo,
@@ -232,6 +220,7 @@ class OceanGridCanvas(GameCanvas):
                       
     def _on_mouse_btn1_release(self, event: tkinter.Event) -> None:
         self._mouse_btn1_down = False
+        self._cancel_drag()
         if self._has_ship_selected:
             col_width = DEFAULT_PEG_AREA_WIDTH / battleship.COLUMNS
             row_height = DEFAULT_PEG_AREA_WIDTH / battleship.ROWS
@@ -292,10 +281,6 @@ class OceanGridCanvas(GameCanvas):
             else:
                 # Player's ship should now be placed
                 print(self._selected_ship.is_placed)
-                selected_sprite = self._selected_ship.sprite
-                if selected_sprite.id:
-                    self.delete(selected_sprite.id)
-
                 x = y = 0
 
                 if self._selected_ship_is_vertical: 
@@ -317,15 +302,7 @@ class OceanGridCanvas(GameCanvas):
                 print('row1: {} col1: {}, row2: {} col2: {}'.format(start_row_str, start_col+1, end_row_str, end_col+1))
                 print('Degrees: {}'.format(self._selected_ship_degree))
 
-                selected_sprite.x = x
-                selected_sprite.y = y
-                selected_sprite.degree = self._selected_ship_degree
-                selected_sprite.image = self._ship_imgs[self._selected_ship_type][self._selected_ship_degree]
-                selected_sprite.photo = self._ship_photos[self._selected_ship_type][self._selected_ship_degree]
-                selected_sprite.id = self.create_image(
-                    (selected_sprite.x, selected_sprite.y),
-                    image=selected_sprite.photo,
-                    anchor="center")
+                self._move_selected_sprite(x, y)
 
                 self._player.ships[self._selected_ship_type] = self._selected_ship
                 print(self._player.ships)
@@ -378,10 +355,12 @@ class OceanGridCanvas(GameCanvas):
 
     def _deselect_ship(self, should_delete: bool) -> None:
         # Deselect currently selected ship
+        self._cancel_drag()
         selected_sprite = self._selected_ship.sprite
         if selected_sprite.id:
             if should_delete:
                 self.delete(selected_sprite.id)
+                selected_sprite.id = None
 
                 self._player.ships[self._selected_ship_type] = None
                 
@@ -396,26 +375,45 @@ class OceanGridCanvas(GameCanvas):
             if self._has_ship_selected and self._is_placement_phase:
                 if self._is_placement_phase and not self._ships_are_placed and self._confirm_text_id:
                     self.delete(self._confirm_text_id)
-                    
-                selected_sprite = self._selected_ship.sprite
-                if selected_sprite.id:
-                    self.delete(selected_sprite.id)
-                    selected_sprite.x = 0
-                    selected_sprite.y = 0
-                    selected_sprite.degree = 0
-                    selected_sprite.photo = None
-                    selected_sprite.image = None
-
-
-                selected_sprite.x = event.x
-                selected_sprite.y = event.y
-                selected_sprite.degree = self._selected_ship_degree
-                selected_sprite.image = self._ship_imgs[self._selected_ship_type][self._selected_ship_degree]
-                selected_sprite.photo = self._ship_photos[self._selected_ship_type][self._selected_ship_degree]
-                selected_sprite.id = self.create_image(
-                    (event.x, event.y),
-                    image=selected_sprite.photo,
-                    anchor="center")
+
+                self._drag_position = (event.x, event.y)
+                if not self._drag_job:
+                    wait = self._DRAG_FRAME_MS - (time.monotonic() - self._last_drag_update) * 1000
+                    if wait > 0:
+                        self._drag_job = self.after(int(wait) + 1, self._apply_drag)
+                    else:
+                        self._drag_job = self.after_idle(self._apply_drag)
+
+    # moves the dragged ship to the latest mouse position
+    def _apply_drag(self) -> None:
+        self._drag_job = None
+        self._last_drag_update = time.monotonic()
+        if self._has_ship_selected:
+            self._move_selected_sprite(*self._drag_position)
+
+    def _cancel_drag(self) -> None:
+        if self._drag_job:
+            self.after_cancel(self._drag_job)
+            self._drag_job = None
+
+    # moves the selected ship's canvas image, changing the image only when
+    # the rotation changed
+    def _move_selected_sprite(self, x: float, y: float) -> None:
+        selected_sprite = self._selected_ship.sprite
+        path = self._ship_paths[self._selected_ship_type]
+        photo = gImageLoader.photo(path, self._selected_ship_degree)
+
+        selected_sprite.x = x
+        selected_sprite.y = y
+        selected_sprite.degree = self._selected_ship_degree
+        selected_sprite.image = gImageLoader.image(path, self._selected_ship_degree)
+        if selected_sprite.id:
+            self.coords(selected_sprite.id, x, y)
+            if selected_sprite.photo is not photo:
+                self.itemconfigure(selected_sprite.id, image=photo)
+        else:
+            selected_sprite.id = self.create_image((x, y), image=photo, anchor="center")
+        selected_sprite.photo = photo
             
     def _on_shift_down(self, event: tkinter.Event) -> None:
         if self._mouse_btn1_down and self._has_ship_selected:
@@ -433,37 +431,7 @@ class OceanGridCanvas(GameCanvas):
                                                or self._selected_ship_degree == 180
                                                or self._selected_ship_degree == 360)
 
-
-            
-            
-            if not self._ship_photos[self._selected_ship_type][self._selected_ship_degree]:
-                BASE_DEGREE = 0
-                self._ship_imgs[self._selected_ship_type][self._selected_ship_degree] = (
-                    self._ship_imgs[self._selected_ship_type][BASE_DEGREE].rotate(self._selected_ship_degree, expand=True))
-                
-                self._ship_photos[self._selected_ship_type][self._selected_ship_degree] = (
-                    ImageTk.PhotoImage(self._ship_imgs[self._selected_ship_type][self._selected_ship_degree]))
-
-
-            selected_sprite = self._selected_ship.sprite
-            if selected_sprite.id:
-                    self.delete(selected_sprite.id)
-                    selected_sprite.x = 0
-                    selected_sprite.y = 0
-                    selected_sprite.degree = 0
-                    selected_sprite.photo = None
-                    selected_sprite.image = None
-
-
-            selected_sprite.x = event.x
-            selected_sprite.y = event.y
-            selected_sprite.degree = self._selected_ship_degree
-            selected_sprite.image = self._ship_imgs[self._selected_ship_type][self._selected_ship_degree]
-            selected_sprite.photo = self._ship_photos[self._selected_ship_type][self._selected_ship_degree]
-            selected_sprite.id = self.create_image(
-                (selected_sprite.x, selected_sprite.y),
-                image=selected_sprite.photo,
-                anchor="center")   
+            self._move_selected_sprite(event.x, event.y)
 
     def _get_bay_ship_type(self, y: int) -> battleship.Ship:
         y_ratio = y / self.winfo_height()
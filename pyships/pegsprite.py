@@ -1,5 +1,7 @@
 # Represents Pegs on the board as colored circles
 class PegSprite:
+    __slots__ = ('id', 'color', 'x1', 'x2', 'y1', 'y2')
+
     def __init__(self):
         self.id = None
         self.color = None
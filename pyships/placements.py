@@ -0,0 +1,155 @@
+from .board import ROWS, COLUMNS, CELLS, CLASSIC_BOARD, Board, cell_index
+from .errortypes import OffBoardError, LengthError, ShipInWayError
+from .ships import FLEET
+
+# Every legal ship placement on the board, built once per ship length.
+#
+# PLACEMENTS[length] is a tuple of (cells, mask) pairs: the cell indices
+# covered by the ship (ascending, i.e. ship.parts order) and the same cells
+# as a bitmask. A placement is legal on a board when mask & occupied == 0.
+#
+# CELL_PLACEMENTS[length][cell] holds the indices into PLACEMENTS[length]
+# of every placement covering that cell.
+#
+# PLACEMENT_ENDS[length] maps (start cell, end cell), in either order, to
+# the index of the placement between them.
+PLACEMENTS = dict()
+CELL_PLACEMENTS = dict()
+PLACEMENT_ENDS = dict()
+
+def _build(length: int) -> None:
+    placements = []
+    cell_placements = [[] for _ in range(CELLS)]
+    ends = dict()
+
+    # Horizontal placements first, then vertical (the same cells for length 1)
+    orientations = ((1, ROWS, COLUMNS - length + 1),
+                    (COLUMNS, ROWS - length + 1, COLUMNS))
+    for step, rows, cols in orientations[:1 if length == 1 else 2]:
+        for r in range(rows):
+            for c in range(cols):
+                first = r * COLUMNS + c
+                cells = tuple(first + i * step for i in range(length))
+                mask = 0
+                for cell in cells:
+                    mask |= 1 << cell
+                    cell_placements[cell].append(len(placements))
+
+                ends[(cells[0], cells[-1])] = ends[(cells[-1], cells[0])] = len(placements)
+                placements.append((cells, mask))
+
+    PLACEMENTS[length] = tuple(placements)
+    CELL_PLACEMENTS[length] = tuple(tuple(indices) for indices in cell_placements)
+    PLACEMENT_ENDS[length] = ends
+
+def placements(length: int) -> '[((int,), int)]':
+    # PLACEMENTS[length], built on first use for lengths outside the fleet
+    if length not in PLACEMENTS:
+        _build(length)
+    return PLACEMENTS[length]
+
+# Outcome of checking a placement without raising, see placement_status()
+# and the grids' can_place/try_place methods
+PLACE_OK = 0
+PLACE_OFF_BOARD = 1
+PLACE_BAD_LENGTH = 2
+PLACE_SHIP_IN_WAY = 3
+
+# Error the raising placement methods give for each failed status
+PLACEMENT_ERRORS = {PLACE_OFF_BOARD: OffBoardError,
+                    PLACE_BAD_LENGTH: LengthError,
+                    PLACE_SHIP_IN_WAY: ShipInWayError}
+
+def _shape(start: int, end: int, length: int, board: Board) -> (int, int, int):
+    # (status, first cell, step between cells) of a ship from start to end,
+    # ignoring other ships
+    if not (0 <= start < board.cells and 0 <= end < board.cells):
+        return PLACE_OFF_BOARD, 0, 0
+
+    start_row, start_col = divmod(start, board.columns)
+    end_row, end_col = divmod(end, board.columns)
+    if start_row == end_row:
+        step = 1
+        assumed_length = abs(end_col - start_col) + 1
+    elif start_col == end_col:
+        step = board.columns
+        assumed_length = abs(end_row - start_row) + 1
+    else:
+        return PLACE_OFF_BOARD, 0, 0
+
+    if assumed_length != length:
+        return PLACE_BAD_LENGTH, 0, 0
+    return PLACE_OK, min(start, end), step
+
+def placement_status(start: int, end: int, length: int, board: Board = CLASSIC_BOARD) -> (int, (int,)):
+    # (status, cells) of a ship from start to end on an empty board, without
+    # raising. cells is None unless status is PLACE_OK. No mask is built, as
+    # on a large board one costs as much as the board is big.
+    if board == CLASSIC_BOARD:
+        if length not in PLACEMENTS:
+            _build(length)
+        index = PLACEMENT_ENDS[length].get((start, end))
+        if index is not None:
+            return PLACE_OK, PLACEMENTS[length][index][0]
+
+    status, first, step = _shape(start, end, length, board)
+    if status != PLACE_OK:
+        return status, None
+
+    return PLACE_OK, tuple(range(first, first + step * length, step))
+
+def find_placement(start: (str, int), end: (str, int), length: int) -> int:
+    # Index into PLACEMENTS[length] of the placement from start to end.
+    # Raises the same errors as placing the ship by hand would.
+    return find_cell_placement(cell_index(start), cell_index(end), length)
+
+def find_cell_placement(start: int, end: int, length: int) -> int:
+    # find_placement for flat cell indices
+    if length not in PLACEMENTS:
+        _build(length)
+
+    index = PLACEMENT_ENDS[length].get((start, end))
+    if index is None:
+        # Not a legal placement, work out why
+        raise PLACEMENT_ERRORS[_shape(start, end, length, CLASSIC_BOARD)[0]]()
+
+    return index
+
+def placement_cells(start: int, end: int, length: int, board: Board = CLASSIC_BOARD) -> (int,):
+    # Cells covered by a ship from start to end on any board, in ship.parts
+    # order. The classic board uses the index, other sizes are worked out
+    # directly so large boards never build one.
+    status, cells = placement_status(start, end, length, board)
+    if status != PLACE_OK:
+        raise PLACEMENT_ERRORS[status]()
+    return cells
+
+def layout_placements(layout: (int,), lengths: (int,), board: Board = CLASSIC_BOARD) -> (int, [((int,), int)], int):
+    # (status, (cells, mask) per ship, mask of every ship) of a fleet layout,
+    # one index into PLACEMENTS[length] per ship, without raising. Only the
+    # masks are compared, so a whole fleet is checked before any grid is
+    # touched. Layouts index the classic board only.
+    if board != CLASSIC_BOARD:
+        raise ValueError('Fleet layouts need the classic board, not {!r}'.format(board))
+    if len(layout) != len(lengths):
+        raise ValueError('Layout has {} placements for {} ships'.format(len(layout), len(lengths)))
+
+    chosen = []
+    occupied = 0
+    for index, length in zip(layout, lengths):
+        table = placements(length)
+        if not 0 <= index < len(table):
+            return PLACE_OFF_BOARD, None, 0
+        placement = table[index]
+        if occupied & placement[1]:
+            return PLACE_SHIP_IN_WAY, None, 0
+        occupied |= placement[1]
+        chosen.append(placement)
+    return PLACE_OK, chosen, occupied
+
+def legal_placements(length: int, occupied: int) -> [int]:
+    # Indices of the placements of a ship of length that avoid occupied
+    return [i for i, (cells, mask) in enumerate(placements(length)) if not mask & occupied]
+
+for _length in sorted({ship_type().length for ship_type in FLEET}):
+    _build(_length)
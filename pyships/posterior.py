@@ -0,0 +1,187 @@
+import random
+
+from .board import CELLS, CLASSIC_BOARD
+from .fleetgen import FLEET_LENGTHS
+from .placements import PLACEMENTS, CELL_PLACEMENTS, find_cell_placement
+from .ships import FLEET
+
+# Monte Carlo sampling of the enemy fleet layouts that agree with what a
+# TargetGrid has seen (classic board).
+#
+# A layout has one index into PLACEMENTS[length] per ship, in fleet order,
+# like fleetgen. Samples are built by constraint propagation instead of
+# rejection:
+#   - sunk ships are fixed, and no placement may cover a miss or a sunk ship
+#     or lie entirely on hits (that ship would have been reported sunk)
+#   - while hits are uncovered, the hit with the fewest live placements
+#     through it is covered next by one of them
+#   - the ships left over are placed among the placements still free
+# A dead end (an open hit or a leftover ship with no free placement)
+# abandons the sample and starts the whole layout again, it does not back
+# up to the last choice. Backing up would change the chance of drawing the
+# layouts past that choice, and the weights below would no longer be its
+# inverse.
+#
+# Restarts are what sampling costs late in a game. With no shots dead ends
+# never happen, but with dozens of misses and hits not yet pinned to a ship
+# a third to a half of the attempts can fail, each after most of a layout
+# was built. sample_layouts gives up after max_attempts failures in a row.
+#
+# Every sample comes with the product of the number of options at each
+# step. The chance of drawing a layout is the inverse of that weight, so
+# weighting samples by it gives expectations over all consistent layouts
+# taken as equally likely (see cell_odds).
+
+class Observation:
+    __slots__ = ('hits', 'misses', 'sunk')
+
+    def __init__(self, hits: int = 0, misses: int = 0, sunk: '{int: int}' = None):
+        # hits/misses are cell bitmasks, sunk maps fleet position to placement
+        self.hits = hits
+        self.misses = misses
+        self.sunk = sunk if sunk is not None else dict()
+
+    @classmethod
+    def from_target_grid(cls, target_grid: 'TargetGrid', fleet: ['type'] = FLEET) -> 'Observation':
+        if target_grid.board != CLASSIC_BOARD:
+            raise ValueError('Layouts can only be sampled on the classic board')
+
+        hits, misses = target_grid.peg_masks()
+        sunk = dict()
+        for ship in target_grid.sunk_ships:
+            position = next(i for i, ship_type in enumerate(fleet)
+                            if ship_type is type(ship) and i not in sunk)
+            sunk[position] = find_cell_placement(CLASSIC_BOARD.cell_index(ship.start()),
+                                                 CLASSIC_BOARD.cell_index(ship.end()), ship.length)
+        return cls(hits, misses, sunk)
+
+class _Sampler:
+    # Search tables for one observation, shared by every sample
+    __slots__ = ('lengths', 'layout', 'free', 'allowed', 'candidates', 'open_hits')
+
+    def __init__(self, observation: Observation, lengths: (int,)):
+        self.lengths = lengths
+        self.layout = [None] * len(lengths)
+        sunk_cells = 0
+        for position, index in observation.sunk.items():
+            self.layout[position] = index
+            sunk_cells |= PLACEMENTS[lengths[position]][index][1]
+
+        blocked = observation.misses | sunk_cells
+        self.open_hits = observation.hits & ~sunk_cells
+        self.free = [i for i in range(len(lengths)) if i not in observation.sunk]
+        # Per free ship: allowed flag per placement and the allowed indices
+        self.allowed = dict()
+        self.candidates = dict()
+        for i in self.free:
+            table = PLACEMENTS[lengths[i]]
+            allowed = bytearray(len(table))
+            for index, (cells, mask) in enumerate(table):
+                if not mask & blocked and mask & ~observation.hits:
+                    allowed[index] = 1
+            self.allowed[i] = allowed
+            self.candidates[i] = [index for index in range(len(table)) if allowed[index]]
+            if not self.candidates[i]:
+                raise ValueError('No layout agrees with the observation')
+
+    def sample(self, rng: random.Random) -> ((int,), int):
+        # One layout and its weight, or None at a dead end
+        lengths = self.lengths
+        layout = list(self.layout)
+        free = list(self.free)
+        occupied = 0
+        uncovered = self.open_hits
+        weight = 1
+
+        while uncovered:
+            options = None
+            pending = uncovered
+            while pending:
+                low = pending & -pending
+                hit = low.bit_length() - 1
+                pending ^= low
+
+                through = []
+                for i in free:
+                    allowed = self.allowed[i]
+                    table = PLACEMENTS[lengths[i]]
+                    for index in CELL_PLACEMENTS[lengths[i]][hit]:
+                        if allowed[index] and not table[index][1] & occupied:
+                            through.append((i, index))
+                if not through:
+                    return None
+                if options is None or len(through) < len(options):
+                    options = through
+
+            i, index = rng.choice(options)
+            weight *= len(options)
+            mask = PLACEMENTS[lengths[i]][index][1]
+            layout[i] = index
+            occupied |= mask
+            uncovered &= ~mask
+            free.remove(i)
+
+        for i in free:
+            table = PLACEMENTS[lengths[i]]
+            options = [index for index in self.candidates[i] if not table[index][1] & occupied]
+            if not options:
+                return None
+            index = rng.choice(options)
+            weight *= len(options)
+            layout[i] = index
+            occupied |= table[index][1]
+
+        return tuple(layout), weight
+
+def sample_layouts(observation: Observation, count: int = None, seed: int = None,
+                   lengths: (int,) = FLEET_LENGTHS, max_attempts: int = 100000) -> '[((int,), int)]':
+    # Yield count (layout, weight) samples, forever if count is None. Raises
+    # ValueError when max_attempts samples in a row hit a dead end.
+    sampler = _Sampler(observation, lengths)
+    rng = random.Random(seed)
+    generated = failed = 0
+    while count is None or generated < count:
+        sample = sampler.sample(rng)
+        if sample is None:
+            failed += 1
+            if failed >= max_attempts:
+                raise ValueError('No layout agrees with the observation')
+            continue
+
+        failed = 0
+        generated += 1
+        yield sample
+
+def _sample_chunk(observation: Observation, count: int, seed: str, lengths: (int,)) -> [((int,), int)]:
+    return list(sample_layouts(observation, count, seed, lengths))
+
+def parallel_sample_layouts(observation: Observation, count: int, seed: int = None,
+                            workers: int = None, chunk_size: int = 1000,
+                            lengths: (int,) = FLEET_LENGTHS) -> '[((int,), int)]':
+    # sample_layouts split into chunks over a process pool. Chunk k draws
+    # from its own generator seeded with (seed, k), so a seeded run gives the
+    # same samples whatever the number of workers. Chunks are yielded in
+    # order as they complete.
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk_counts = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_sample_chunk, observation, chunk_count,
+                                   None if seed is None else '{}:{}'.format(seed, k), lengths)
+                   for k, chunk_count in enumerate(chunk_counts)]
+        for future in futures:
+            yield from future.result()
+
+def cell_odds(samples: '[((int,), int)]', lengths: (int,) = FLEET_LENGTHS) -> [float]:
+    # Chance of a ship on every cell, estimated from weighted samples
+    totals = [0] * CELLS
+    total_weight = 0
+    for layout, weight in samples:
+        total_weight += weight
+        for index, length in zip(layout, lengths):
+            for cell in PLACEMENTS[length][index][0]:
+                totals[cell] += weight
+
+    if not total_weight:
+        return [0.0] * CELLS
+    return [total / total_weight for total in totals]
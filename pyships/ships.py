@@ -1,34 +1,45 @@
-from PIL import ImageTk
-
 from .errortypes import HitError, LengthError
 
 class ShipSprite:
     # Use in place wherever an ID is needed
+    __slots__ = ('id', 'image', 'photo', 'degree', 'x', 'y', 'is_placed')
+
     def __init__(self):
         self.id = None
         self.image = None
         self.photo = None
         self.degree = 0
         self.x = self.y = 0
+        self.is_placed = False
 
     def copy(self) -> 'ShipSprite':
-        # Return copy but without the same ID
+        # Return copy but without the same ID, sharing the cached photo
         new_sprite = ShipSprite()
         new_sprite.x = self.x
         new_sprite.y = self.y
         new_sprite.degree = self.degree
         new_sprite.is_placed = self.is_placed
         new_sprite.image = self.image
-        new_sprite.photo = ImageTk.PhotoImage(self.image)
+        new_sprite.photo = self.photo
         return new_sprite
 
 class Ship:
+    # Part state lives on the ship: one bit per part in _hit_parts and the
+    # part locations in _locations (None while unplaced)
+    __slots__ = ('_length', '_parts', '_is_destroyed', '_remaining', '_is_placed',
+                 '_hit_parts', '_locations', '_sprite')
+
     def __init__(self, length: int):
         self._length = length
-        self._parts = [ShipPart(self) for p in range(length)]
+        self._parts = tuple(ShipPart(self, i) for i in range(length))
         self._is_destroyed = False
+        # Parts left to hit before the ship is destroyed
+        self._remaining = length
         self._is_placed = False
-        self._sprite = ShipSprite()
+        self._hit_parts = 0
+        self._locations = None
+        # Only built when a canvas asks for it
+        self._sprite = None
 
     @property
     def is_placed(self) -> bool:
@@ -36,6 +47,8 @@ class Ship:
 
     @property
     def sprite(self) -> ShipSprite:
+        if self._sprite is None:
+            self._sprite = ShipSprite()
         return self._sprite
 
     @property
@@ -43,33 +56,35 @@ class Ship:
         return self._length
     
     def start(self) -> (str, int):
-        return self._parts[0].location
+        return self._locations[0] if self._locations else None
 
     def end(self) -> (str, int):
-        return self._parts[-1].location
+        return self._locations[-1] if self._locations else None
 
     def place(self, locations: [(str, int)]) -> None:
         if len(locations) != self._length:
             raise LengthError()
 
-        for i in range(self._length):
-            self._parts[i].place(locations[i])
-            
+        self._locations = list(locations)
         self._is_placed = True
 
     def unplace(self) -> None:
-        for part in self._parts:
-            part.unplace()
-
+        self._locations = None
         self._is_placed = False
         
     def on_hit(self) -> None:
         if self._is_destroyed:
             raise HitError('Ship is already destroyed')
-        hits = [part for part in self._parts if part.is_hit]
-        if len(hits) == len(self._parts):
+        self._remaining -= 1
+        if self._remaining == 0:
             self._is_destroyed = True
 
+    def sink(self) -> None:
+        # Mark every part hit at once, for grids that track hits themselves
+        self._hit_parts = (1 << self._length) - 1
+        self._remaining = 0
+        self._is_destroyed = True
+
     @property
     def parts(self) -> '[ShipPart]':
         return self._parts
@@ -79,58 +94,79 @@ class Ship:
         return self._is_destroyed
 
 class ShipPart:
-    def __init__(self, owner: Ship):
+    # View of one part of a ship, its state is kept by the owner
+    __slots__ = ('_owner', '_index')
+
+    def __init__(self, owner: Ship, index: int = 0):
         self._owner = owner
-        self._is_hit = False
-        self._location = None
+        self._index = index
         
     def on_hit(self) -> None:
-        if self._is_hit:
+        bit = 1 << self._index
+        if self._owner._hit_parts & bit:
             raise HitError()
-        self._is_hit = True
+        self._owner._hit_parts |= bit
         self._owner.on_hit()
 
     def place(self, location: (str, int)) -> None:
-        self._location = location
+        owner = self._owner
+        if owner._locations is None:
+            owner._locations = [None] * owner._length
+        owner._locations[self._index] = location
 
     def unplace(self) -> None:
-        self._location = None
+        if self._owner._locations is not None:
+            self._owner._locations[self._index] = None
 
     @property
     def location(self) -> (str, int):
-        return self._location
+        locations = self._owner._locations
+        return locations[self._index] if locations else None
 
     @property
     def is_hit(self) -> bool:
-        return self._is_hit
+        return bool(self._owner._hit_parts >> self._index & 1)
     
     @property
     def owner(self) -> Ship:
         return self._owner
 
     def __str__(self):
-        if self._is_hit:
+        if self._owner._hit_parts >> self._index & 1:
             return 'H'
         else:
             return 'S'
 
         
 class Carrier(Ship):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(5)
 
 class BattleShip(Ship):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(4)
 
 class Destroyer(Ship):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(3)
 
 class Submarine(Ship):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(3)
 
 class PatrolBoat(Ship):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(2)
+
+# Ship types in a classic fleet, in the order they are set up
+FLEET = (Carrier, BattleShip, Destroyer, Submarine, PatrolBoat)
@@ -0,0 +1,314 @@
+import struct
+
+from .board import CLASSIC_BOARD, Board, mask_cells
+from .ships import FLEET
+
+# Versioned binary snapshot of a ClassicGame (see ClassicGame.to_bytes).
+#
+# Version 3 layout, all integers big-endian:
+#
+#   magic    2 bytes  b'PS'
+#   version  1 byte   3
+#   flags    1 byte   see _FLAG_*
+#   board    2 x u16  rows, columns (only without _FLAG_CLASSIC_BOARD)
+#   for each player:
+#     count  u8       number of ships (only without _FLAG_CLASSIC_FLEET)
+#     ships  count x  [u8 FLEET index (only without _FLAG_CLASSIC_FLEET)]
+#                     cell of the ship's first part, the top bit set for a
+#                     vertical ship, all ones for a ship not yet created/placed.
+#                     1 byte while the board has < 128 cells, 2 below 32768,
+#                     4 otherwise
+#     hits   ceil(cells / 8) bytes  hit pegs on the ocean grid, bit = cell
+#     misses ceil(cells / 8) bytes  miss pegs on the ocean grid
+#            with _FLAG_CELL_LISTS both are cell lists instead: a varint
+#            count, then a varint per cell of the gap since the previous
+#            cell (the first counted from -1), in ascending order
+#     sunk   u8 count + count x u8  positions in ships above of the ships the
+#            opponent has sunk, in the order they sank
+#   names    u8 length + UTF-8 per player (only with _FLAG_NAMES)
+#
+# Varints are little-endian base 128, 7 bits per byte with the top bit set
+# on all but the last. The encoder writes cell lists whenever they are the
+# smaller of the two, so a large board with few shots costs bytes per shot
+# rather than bytes per eight cells.
+#
+# Ship hits, target grids and which enemy ships are sunk all follow from the
+# ocean grid pegs, so they are rebuilt rather than stored. Only the order
+# the ships sank in (TargetGrid.sunk_ships) does not, hence the sunk lists.
+# A classic game without names is at most 77 bytes.
+#
+# Version 2 is version 3 without the sunk lists and version 1 is version 2
+# without _FLAG_CELL_LISTS. Both are still read, sinking the ships in cell
+# order of their last hit.
+
+MAGIC = b'PS'
+VERSION = 3
+
+_FLAG_PLAYER2_TURN = 0x01
+_FLAG_OVER = 0x02
+_FLAG_PLAYER2_WON = 0x04
+_FLAG_NAMES = 0x08
+_FLAG_CLASSIC_BOARD = 0x10
+_FLAG_CLASSIC_FLEET = 0x20
+_FLAG_CELL_LISTS = 0x40
+
+_HEADER = struct.Struct('>2sBB')
+_BOARD = struct.Struct('>HH')
+
+def _cell_format(board: Board) -> struct.Struct:
+    if board.cells < 0x80:
+        return struct.Struct('>B')
+    if board.cells < 0x8000:
+        return struct.Struct('>H')
+    return struct.Struct('>I')
+
+def _varint_size(value: int) -> int:
+    return max(1, (value.bit_length() + 6) // 7)
+
+def _write_varint(data: bytearray, value: int) -> None:
+    while value > 0x7F:
+        data.append(0x80 | (value & 0x7F))
+        value >>= 7
+    data.append(value)
+
+def _read_varint(data: memoryview, offset: int) -> (int, int):
+    # (value, offset past it)
+    value = shift = 0
+    while True:
+        try:
+            byte = data[offset]
+        except IndexError:
+            raise ValueError('Snapshot is truncated') from None
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def _write_cells(data: bytearray, cells: [int]) -> None:
+    # cells must be ascending, see the cell lists above
+    _write_varint(data, len(cells))
+    previous = -1
+    for cell in cells:
+        _write_varint(data, cell - previous - 1)
+        previous = cell
+
+def _read_cells(data: memoryview, offset: int) -> ([int], int):
+    # (cells, offset past them)
+    count, offset = _read_varint(data, offset)
+    cells = []
+    cell = -1
+    for _ in range(count):
+        gap, offset = _read_varint(data, offset)
+        cell += gap + 1
+        cells.append(cell)
+    return cells, offset
+
+def encode_game(game: 'ClassicGame', include_names: bool = False) -> bytes:
+    board = game.board
+    players = (game._player1, game._player2)
+    cell_format = _cell_format(board)
+    unplaced = (1 << (cell_format.size * 8)) - 1
+    vertical = 1 << (cell_format.size * 8 - 1)
+    peg_bytes = (board.cells + 7) // 8
+
+    flags = 0
+    if game.current_player is game._player2:
+        flags |= _FLAG_PLAYER2_TURN
+    if game.is_over:
+        flags |= _FLAG_OVER
+    if game.winner is game._player2:
+        flags |= _FLAG_PLAYER2_WON
+    if include_names:
+        flags |= _FLAG_NAMES
+    if board == CLASSIC_BOARD:
+        flags |= _FLAG_CLASSIC_BOARD
+    # Ships come from each ocean grid, see ClassicPlayer.fleet
+    fleets = [player.fleet() for player in players]
+    classic_fleet = all([name for name, ship in fleet] == [ship_type.__name__ for ship_type in FLEET]
+                        for fleet in fleets)
+    if classic_fleet:
+        flags |= _FLAG_CLASSIC_FLEET
+    # Cell lists cost at most a varint per peg plus the counts, bitmaps the
+    # same whatever the pegs
+    pegs = [player.ocean_grid.peg_cells() for player in players]
+    list_bytes = sum(len(hits) + len(misses) + 2 for hits, misses in pegs) * _varint_size(board.cells)
+    cell_lists = list_bytes < 4 * peg_bytes
+    if cell_lists:
+        flags |= _FLAG_CELL_LISTS
+
+    data = bytearray(_HEADER.pack(MAGIC, VERSION, flags))
+    if board != CLASSIC_BOARD:
+        data += _BOARD.pack(board.rows, board.columns)
+
+    for player, opponent, fleet, (hit_cells, miss_cells) in zip(players, players[::-1], fleets, pegs):
+        if not classic_fleet:
+            data.append(len(fleet))
+
+        for name, ship in fleet:
+            if not classic_fleet:
+                ship_type = type(ship) if ship is not None else None
+                if ship_type not in FLEET or name != ship_type.__name__:
+                    raise ValueError('Snapshots only hold FLEET ships keyed by type name')
+                data.append(FLEET.index(ship_type))
+
+            if ship is None or not ship.is_placed:
+                data += cell_format.pack(unplaced)
+                continue
+
+            start = board.cell_index(ship.start())
+            end = board.cell_index(ship.end())
+            cell = min(start, end)
+            if ship.length > 1 and end - start not in (ship.length - 1, 1 - ship.length):
+                cell |= vertical
+            data += cell_format.pack(cell)
+
+        if cell_lists:
+            _write_cells(data, hit_cells)
+            _write_cells(data, miss_cells)
+        else:
+            hits, misses = player.ocean_grid.peg_masks()
+            data += hits.to_bytes(peg_bytes, 'big')
+            data += misses.to_bytes(peg_bytes, 'big')
+
+        # The opponent's target grid holds this player's ships in sink order
+        positions = {ship: position for position, (name, ship) in enumerate(fleet) if ship is not None}
+        sunk = opponent.target_grid.sunk_ships
+        data.append(len(sunk))
+        for ship in sunk:
+            if ship not in positions:
+                raise ValueError('Sunk ship is not in the fleet of {}'.format(player.name))
+            data.append(positions[ship])
+
+    if include_names:
+        for player in players:
+            name = player.name.encode('utf-8')
+            if len(name) > 0xFF:
+                raise ValueError('Player name is too long for a snapshot')
+            data.append(len(name))
+            data += name
+
+    return bytes(data)
+
+def decode_game(data: bytes, names: (str, str) = None, backend: str = 'list') -> 'ClassicGame':
+    from .battleship import ClassicGame, ClassicPlayer
+    from .errortypes import GameError
+
+    data = memoryview(data)
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not a game snapshot')
+    if version not in (1, 2, VERSION) or version == 1 and flags & _FLAG_CELL_LISTS:
+        raise ValueError('Unsupported snapshot version: {}'.format(version))
+    offset = _HEADER.size
+
+    if flags & _FLAG_CLASSIC_BOARD:
+        board = CLASSIC_BOARD
+    else:
+        board = Board(*_BOARD.unpack_from(data, offset))
+        offset += _BOARD.size
+
+    cell_format = _cell_format(board)
+    unplaced = (1 << (cell_format.size * 8)) - 1
+    vertical = 1 << (cell_format.size * 8 - 1)
+    peg_bytes = (board.cells + 7) // 8
+
+    players = []
+    pegs = []
+    # Each player's ships in the order they sank, None before version 3
+    sink_orders = []
+    for p in range(2):
+        if flags & _FLAG_CLASSIC_FLEET:
+            fleet = FLEET
+        else:
+            count = data[offset]
+            fleet = [FLEET[code] for code in data[offset + 1:offset + 1 + count]]
+            offset += 1 + count
+
+        player = ClassicPlayer('Player{}'.format(p + 1), backend=backend, board=board)
+        player.ships = dict()
+        # Ships by position in the fleet, for the sunk lists
+        ships = []
+        for ship_type in fleet:
+            cell = cell_format.unpack_from(data, offset)[0]
+            offset += cell_format.size
+            if cell == unplaced:
+                player.ships[ship_type.__name__] = None
+                ships.append(None)
+                continue
+
+            ship = ship_type()
+            step = board.columns if cell & vertical else 1
+            cell &= ~vertical
+            player.ocean_grid.place_cell(cell, cell + step * (ship.length - 1), ship)
+            player.ships[ship_type.__name__] = ship
+            ships.append(ship)
+
+        if flags & _FLAG_CELL_LISTS:
+            hits, offset = _read_cells(data, offset)
+            misses, offset = _read_cells(data, offset)
+        else:
+            hits = mask_cells(int.from_bytes(data[offset:offset + peg_bytes], 'big'))
+            misses = mask_cells(int.from_bytes(data[offset + peg_bytes:offset + 2 * peg_bytes], 'big'))
+            offset += 2 * peg_bytes
+
+        if version >= 3:
+            count = data[offset]
+            try:
+                sink_order = [ships[position] for position in data[offset + 1:offset + 1 + count]]
+            except IndexError:
+                raise ValueError('Snapshot sinks a ship that is not in the fleet') from None
+            offset += 1 + count
+        else:
+            sink_order = None
+
+        players.append(player)
+        pegs.append((hits, misses))
+        sink_orders.append(sink_order)
+
+    if flags & _FLAG_NAMES:
+        for player in players:
+            length = data[offset]
+            player.name = bytes(data[offset + 1:offset + 1 + length]).decode('utf-8')
+            offset += 1 + length
+    if names is not None:
+        players[0].name, players[1].name = names
+
+    # The game checks the fleets and the empty target grids, so it is made
+    # before any peg is replayed
+    try:
+        game = ClassicGame(players[0], players[1], board)
+    except GameError as e:
+        raise ValueError('Snapshot is not a playable game: {}'.format(e)) from None
+
+    # Replay the pegs onto each ocean grid and the opponent's target grid.
+    # Pegs come in cell order, so sunk ships are only handed to the target
+    # grid afterwards in their recorded order.
+    for player, opponent, (hits, misses), sink_order in zip(players, players[::-1], pegs, sink_orders):
+        sunk = []
+        for cells, is_hit in ((hits, True), (misses, False)):
+            for cell in cells:
+                ship = player.ocean_grid.receive_shot_cell(cell)
+                if is_hit != (ship is not None):
+                    raise ValueError('Snapshot pegs do not match its ships')
+                if is_hit:
+                    if ship.is_destroyed:
+                        sunk.append(ship)
+                    opponent.target_grid.hit_cell(cell)
+                else:
+                    opponent.target_grid.miss_cell(cell)
+
+        if sink_order is not None:
+            if len(sink_order) != len(sunk) or set(sink_order) != set(sunk):
+                raise ValueError('Snapshot sunk ships do not match its pegs')
+            sunk = sink_order
+        for ship in sunk:
+            opponent.target_grid.place_enemy_cell(board.cell_index(ship.start()),
+                                                  board.cell_index(ship.end()), ship)
+
+    game._current_player = players[1] if flags & _FLAG_PLAYER2_TURN else players[0]
+    game._is_over = bool(flags & _FLAG_OVER)
+    if game._is_over:
+        game._winner = players[1] if flags & _FLAG_PLAYER2_WON else players[0]
+
+    return game
@@ -1,5 +1,5 @@
 import tkinter
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 from . import battleship
 from .battleshipconfig import (
@@ -18,7 +18,7 @@ from .pegsprite import PegSprite
 # Canvas for the core gameplay (clicking grids to find opponent ships). Maintains
 # the visual representation of the opponent's grid from discovered information.
 class TargetGridCanvas(GameCanvas):
-    def __init__(self, parent: tkinter.Tk, player: battleship.ClassicPlayer, width: int, height: int, on_shot_attempt: 'str (*)(str, int)'):
+    def __init__(self, parent: tkinter.Tk, player: battleship.ClassicPlayer, width: int, height: int, on_shot_attempt: 'str (*)(int)'):
         super().__init__(parent, bg='blue', width=width, height=height)
         self._parent = parent
         self._width = width
@@ -36,8 +36,9 @@ class TargetGridCanvas(GameCanvas):
         # Initialize peg locations
         self._pegs = [[PegSprite() for _ in range(battleship.COLUMNS)] for _ in range(battleship.ROWS)]
         
-        # Enemy ships placed onto canvas
+        # Enemy ships placed onto canvas, with the canvas image of each
         self._sunk_ships = []
+        self._sunk_ship_ids = dict()
 
         # Has the player clicked
         self._has_clicked = False
@@ -57,6 +58,8 @@ class TargetGridCanvas(GameCanvas):
         self._confirm_y = 0
         self._confirm_width = 0
 
+        self._build_scene()
+
     def display(self) -> None:
         print('Target should display')
         self._start()
@@ -70,56 +73,55 @@ class TargetGridCanvas(GameCanvas):
         # add sunken ship to the player's game board (drawn ship is opponent's)
         self._sunk_ships.append(ship)
         self._redraw()
-        
-    # redraws the entire play area
-    def _redraw(self) -> None:
-        if self._target_grid_id:
-            self.delete(self._target_grid_id)
-            
-        # redraw grid
-        self._target_grid_id = self.create_image((round(self._width/2), round(self._height/2)),
-                                                image=self._target_grid_photo, anchor='center')
 
-        # redraw confirmation text
-        if self._confirm_text_id:
-            self.delete(self._confirm_text_id)
+    # The canvas items are created once by _build_scene and only updated
+    # afterwards (itemconfigure/coords), so the item count stays fixed apart
+    # from one image per sunk ship.
+    def _build_scene(self) -> None:
+        self._target_grid_id = self.create_image((round(self._width/2), round(self._height/2)),
+                                                image=self._target_grid_photo, anchor='center',
+                                                tags='grid')
 
-        if self._has_clicked:
-            self._confirm_text_id = self.create_text((self._confirm_x, self._confirm_y), width=self._confirm_width,
-                                                 fill='white',
-                                                 text=self._confirm_text.format(battleship.ROW_LETTERS[self._shot_row], self._shot_col + 1),
-                                                 anchor='w')
-
-        # redraw the green attempted shot peg
-        if self._has_clicked and self._shot_attempt_peg:
-            if self._shot_attempt_peg.id:
-                self.delete(self._shot_attempt_peg.id)
-
-            self._shot_attempt_peg.id = self.create_oval((self._shot_attempt_peg.x1, self._shot_attempt_peg.y1),
-                             (self._shot_attempt_peg.x2, self._shot_attempt_peg.y2),
-                             fill=self._shot_attempt_peg.color)
-        
-        # redraw all pegs
         for r in range(battleship.ROWS):
             for c in range(battleship.COLUMNS):
                 peg = self._pegs[r][c]
-                if peg.id:
-                    self.delete(peg.id)
+                peg.x1, peg.y1, peg.x2, peg.y2 = self._peg_box(r, c)
+                peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), state='hidden', tags='peg')
 
-                peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color)
-
-        # draw opponent's sunken ships
-        for ship in self._sunk_ships:
-            sprite = ship.sprite
-            if sprite.id:
-                self.delete(sprite.id)
+        peg = PegSprite()
+        peg.color = self._ATTEMPTED_SHOT_COLOR
+        peg.id = self.create_oval((0, 0), (0, 0), fill=peg.color, state='hidden', tags='attempt')
+        self._shot_attempt_peg = peg
 
-            sprite.id = self.create_image(
-                    (sprite.x, sprite.y),
-                    image=sprite.photo, 
-                    anchor="center")
+        self._confirm_text_id = self.create_text((0, 0), fill='white', anchor='w', state='hidden',
+                                                 tags='confirm')
 
-            
+    # brings the scene in line with the current state
+    def _redraw(self) -> None:
+        # opponent's sunken ships are the only items added after _build_scene
+        for ship in self._sunk_ships:
+            if ship not in self._sunk_ship_ids:
+                sprite = ship.sprite
+                self._sunk_ship_ids[ship] = self.create_image(
+                        (sprite.x, sprite.y),
+                        image=sprite.photo, 
+                        anchor="center",
+                        tags='sunk')
+                self.tag_raise('attempt')
+                self.tag_raise('confirm')
+
+        state = 'normal' if self._has_clicked else 'hidden'
+        self.itemconfigure(self._shot_attempt_peg.id, state=state)
+        self.itemconfigure(self._confirm_text_id, state=state)
+
+    # canvas box of the peg at row, col
+    def _peg_box(self, row: int, col: int) -> (float, float, float, float):
+        x_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.COLUMNS
+        y_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.ROWS
+        return (col * x_spacing + DEFAULT_HEADER_WIDTH + DEFAULT_PEG_SIZE,
+                row * y_spacing + DEFAULT_HEADER_HEIGHT + DEFAULT_PEG_SIZE,
+                (col + 1) * x_spacing + DEFAULT_HEADER_WIDTH - DEFAULT_PEG_SIZE,
+                (row + 1) * y_spacing + DEFAULT_HEADER_HEIGHT - DEFAULT_PEG_SIZE)
 
     def _on_mousebtn1_down(self, event: tkinter.Event) -> None:
         x_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.COLUMNS
@@ -137,7 +139,7 @@ class TargetGridCanvas(GameCanvas):
         # determine if the click is a valid spot on the grid of pegs
         try:
             row_str = battleship.ROW_LETTERS[row]
-            if col >= battleship.COLUMNS:
+            if col < 0 or col >= battleship.COLUMNS:
                 raise ValueError()
         except (KeyError, ValueError) as err:
             print('Bad Target click location: {}-{}'.format(row, col+1))
@@ -148,64 +150,38 @@ class TargetGridCanvas(GameCanvas):
             self._draw_attempted_shot() 
             self._draw_confirm_text()
             
-    # draws a green peg at the player's last click location
+    # moves the green peg to the player's last click location
     def _draw_attempted_shot(self) -> None:
-        if self._shot_attempt_peg:
-            if self._shot_attempt_peg.id:
-                self.delete(self._shot_attempt_peg.id)
+        peg = self._shot_attempt_peg
+        peg.x1, peg.y1, peg.x2, peg.y2 = self._peg_box(self._shot_row, self._shot_col)
+        self.coords(peg.id, peg.x1, peg.y1, peg.x2, peg.y2)
+        self.itemconfigure(peg.id, state='normal')
 
-        if self._confirm_text_id:
-            self.delete(self._confirm_text_id)
-        
-        x_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.COLUMNS
-        y_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.ROWS
-        
-        peg = PegSprite()
-        peg.color = self._ATTEMPTED_SHOT_COLOR
-        peg.x1 = self._shot_col * x_spacing + DEFAULT_HEADER_WIDTH + DEFAULT_PEG_SIZE
-        peg.y1 = self._shot_row * y_spacing + DEFAULT_HEADER_HEIGHT + DEFAULT_PEG_SIZE
-        peg.x2 = (self._shot_col + 1) * x_spacing + DEFAULT_HEADER_WIDTH - DEFAULT_PEG_SIZE
-        peg.y2 = (self._shot_row + 1) * y_spacing + DEFAULT_HEADER_HEIGHT - DEFAULT_PEG_SIZE
-        # peg.id = peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color)
-        peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color)
-        self._shot_attempt_peg = peg
-
-    # draws a message displaying the row-column location the player clicked
+    # displays a message with the row-column location the player clicked
     def _draw_confirm_text(self) -> None:
         self._confirm_x = DEFAULT_SHIPBAY_X1
         self._confirm_y = DEFAULT_HEADER_HEIGHT
         self._confirm_width = DEFAULT_WIDTH - self._confirm_x
-        
-        self._confirm_text_id = self.create_text((self._confirm_x, self._confirm_y), width=self._confirm_width,
-                                                 fill='white',
-                                                 text=self._confirm_text.format(battleship.ROW_LETTERS[self._shot_row], self._shot_col + 1),
-                                                 anchor='w')
+
+        self.coords(self._confirm_text_id, self._confirm_x, self._confirm_y)
+        self.itemconfigure(self._confirm_text_id, width=self._confirm_width, state='normal',
+                           text=self._confirm_text.format(battleship.ROW_LETTERS[self._shot_row], self._shot_col + 1))
 
     # attempt to send a shot at the other player
     def _on_return_down(self, event: tkinter.Event) -> None:
         if self._has_clicked:
             # determine if the shot hit a ship on the other board
-            color = self._on_shot_attempt(battleship.ROW_LETTERS[self._shot_row], self._shot_col)
+            color = self._on_shot_attempt(self._shot_row * battleship.COLUMNS + self._shot_col)
 
             if color: # only get a color back if click was good, but may not be a hit
-                x_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.COLUMNS
-                y_spacing = DEFAULT_PEG_AREA_WIDTH / battleship.ROWS
-
-                # draw a peg representing the hit or miss
-                peg = PegSprite()
+                # show the peg representing the hit or miss
+                peg = self._pegs[self._shot_row][self._shot_col]
                 peg.color = color
-                peg.x1 = self._shot_col * x_spacing + DEFAULT_HEADER_WIDTH + DEFAULT_PEG_SIZE
-                peg.y1 = self._shot_row * y_spacing + DEFAULT_HEADER_HEIGHT + DEFAULT_PEG_SIZE
-                peg.x2 = (self._shot_col + 1) * x_spacing + DEFAULT_HEADER_WIDTH - DEFAULT_PEG_SIZE
-                peg.y2 = (self._shot_row + 1) * y_spacing + DEFAULT_HEADER_HEIGHT - DEFAULT_PEG_SIZE
-                peg.id = self.create_oval((peg.x1, peg.y1), (peg.x2, peg.y2), fill=peg.color)
-                self._pegs[self._shot_row][self._shot_col] = peg
+                self.itemconfigure(peg.id, fill=peg.color, state='normal')
 
                 self._has_clicked = False
-                self._attempted_shot = None
-
-                if self._confirm_text_id:
-                    self.delete(self._confirm_text_id)
+                self.itemconfigure(self._shot_attempt_peg.id, state='hidden')
+                self.itemconfigure(self._confirm_text_id, state='hidden')
             
     def _start(self) -> None:
        self._redraw()
@@ -0,0 +1,185 @@
+from .board import RED, WHITE, Board
+
+# Console text of ocean and target grids, for any grid backend.
+#
+# A grid's text is fully determined by three masks of cell indices: the
+# cells with a ship part (ship_mask()) and the hit and miss pegs
+# (peg_masks()). A part shows as H once its cell is hit, S before.
+#
+# BoardText keeps the text of one grid and on every text() call rebuilds
+# only the rows whose cells changed since the last one. AnsiBoard draws a
+# grid once at a fixed place on a terminal and afterwards emits only the
+# escape sequences for the cells that changed, which keeps redraws small
+# on slow links. render_many() renders many grids into one string for
+# log dumps.
+#
+# The text is the same as str(grid).
+
+_PART_STR = '{:<2}'
+_EMPTY = '..'
+_SUNK_PART = _PART_STR.format('H')
+_AFLOAT_PART = _PART_STR.format('S')
+_HIT_PEG = _PART_STR.format(RED)
+_MISS_PEG = _PART_STR.format(WHITE)
+
+class _Layout:
+    # Per board pieces that every render of a grid on that board shares
+    __slots__ = ('header', 'row_prefixes', 'row_masks')
+
+    def __init__(self, board: Board):
+        columns = board.columns
+        self.header = '  ' + ''.join(_PART_STR.format(c+1) for c in range(columns))
+        self.row_prefixes = ['{} '.format(board.row_letters[r]) for r in range(board.rows)]
+        self.row_masks = [((1 << columns) - 1) << (r * columns) for r in range(board.rows)]
+
+_layouts = dict()
+
+def _layout(board: Board) -> _Layout:
+    layout = _layouts.get(board)
+    if layout is None:
+        layout = _layouts[board] = _Layout(board)
+    return layout
+
+def _cell_str(bit: int, ships: int, hits: int, misses: int) -> str:
+    if ships & bit:
+        return _SUNK_PART if hits & bit else _AFLOAT_PART
+    if hits & bit:
+        return _HIT_PEG
+    if misses & bit:
+        return _MISS_PEG
+    return _EMPTY
+
+def _row_str(layout: _Layout, row: int, columns: int, ships: int, hits: int, misses: int) -> str:
+    # Rows with nothing in them are the common case early in a game
+    if not (ships | hits | misses) & layout.row_masks[row]:
+        return layout.row_prefixes[row] + _EMPTY * columns
+    # Shifted down to the row the masks are small, so the per cell tests
+    # stay cheap however large the board is
+    first = row * columns
+    row_mask = (1 << columns) - 1
+    ships = ships >> first & row_mask
+    hits = hits >> first & row_mask
+    misses = misses >> first & row_mask
+    cells = [layout.row_prefixes[row]]
+    for c in range(columns):
+        bit = 1 << c
+        if ships & bit:
+            cells.append(_SUNK_PART if hits & bit else _AFLOAT_PART)
+        elif hits & bit:
+            cells.append(_HIT_PEG)
+        elif misses & bit:
+            cells.append(_MISS_PEG)
+        else:
+            cells.append(_EMPTY)
+    return ''.join(cells)
+
+def _masks(grid: 'OceanGrid or TargetGrid') -> (int, int, int):
+    hits, misses = grid.peg_masks()
+    return grid.ship_mask(), hits, misses
+
+def board_text(grid: 'OceanGrid or TargetGrid') -> str:
+    # One-off text of grid, without a cache
+    board = grid.board
+    layout = _layout(board)
+    ships, hits, misses = _masks(grid)
+    lines = [layout.header]
+    lines.extend(_row_str(layout, r, board.columns, ships, hits, misses) for r in range(board.rows))
+    return '\n'.join(lines).rstrip()
+
+class BoardText:
+    __slots__ = ('_grid', '_layout', '_rows', '_masks', '_text')
+
+    def __init__(self, grid: 'OceanGrid or TargetGrid'):
+        self._grid = grid
+        self._layout = _layout(grid.board)
+        self._rows = None
+        self._masks = None
+        self._text = None
+
+    @property
+    def grid(self) -> 'OceanGrid or TargetGrid':
+        return self._grid
+
+    def text(self) -> str:
+        masks = _masks(self._grid)
+        if masks == self._masks:
+            return self._text
+
+        board = self._grid.board
+        layout = self._layout
+        ships, hits, misses = masks
+        if self._rows is None:
+            self._rows = [_row_str(layout, r, board.columns, ships, hits, misses) for r in range(board.rows)]
+        else:
+            old_ships, old_hits, old_misses = self._masks
+            changed = (ships ^ old_ships) | (hits ^ old_hits) | (misses ^ old_misses)
+            for r, row_mask in enumerate(layout.row_masks):
+                if changed & row_mask:
+                    self._rows[r] = _row_str(layout, r, board.columns, ships, hits, misses)
+
+        self._masks = masks
+        self._text = (layout.header + '\n' + '\n'.join(self._rows)).rstrip()
+        return self._text
+
+    def __str__(self):
+        return self.text()
+
+class AnsiBoard:
+    # A grid drawn on an ANSI terminal with its header line at (top, left),
+    # both 1-based. The first frame() draws the whole grid, later ones only
+    # the cells that changed. The cursor is saved and restored around every
+    # frame so a prompt below the board stays where it is.
+    __slots__ = ('_grid', '_layout', '_top', '_left', '_masks')
+
+    def __init__(self, grid: 'OceanGrid or TargetGrid', top: int = 1, left: int = 1):
+        self._grid = grid
+        self._layout = _layout(grid.board)
+        self._top = top
+        self._left = left
+        self._masks = None
+
+    def invalidate(self) -> None:
+        # Draw everything on the next frame, e.g. after the screen was cleared
+        self._masks = None
+
+    def frame(self) -> str:
+        # Escape sequences that bring the terminal up to date, '' if nothing
+        # changed
+        masks = _masks(self._grid)
+        if masks == self._masks:
+            return ''
+
+        board = self._grid.board
+        layout = self._layout
+        top, left = self._top, self._left
+        ships, hits, misses = masks
+        out = ['\x1b7']
+        if self._masks is None:
+            out.append('\x1b[{};{}H{}'.format(top, left, layout.header))
+            for r in range(board.rows):
+                out.append('\x1b[{};{}H{}'.format(top + 1 + r, left,
+                                                   _row_str(layout, r, board.columns, ships, hits, misses)))
+        else:
+            old_ships, old_hits, old_misses = self._masks
+            changed = (ships ^ old_ships) | (hits ^ old_hits) | (misses ^ old_misses)
+            columns = board.columns
+            while changed:
+                bit = changed & -changed
+                changed ^= bit
+                cell = bit.bit_length() - 1
+                r, c = divmod(cell, columns)
+                out.append('\x1b[{};{}H{}'.format(top + 1 + r, left + len(layout.row_prefixes[r]) + 2 * c,
+                                                   _cell_str(bit, ships, hits, misses)))
+        out.append('\x1b8')
+
+        self._masks = masks
+        return ''.join(out)
+
+def render_many(grids: ['OceanGrid or TargetGrid'], separator: str = '\n\n', out: 'file' = None) -> str:
+    # Text of every grid joined by separator in one buffer. Written to out
+    # in a single call when given, in which case '' is returned.
+    text = separator.join(board_text(grid) for grid in grids)
+    if out is not None:
+        out.write(text)
+        return ''
+    return text
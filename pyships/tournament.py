@@ -0,0 +1,239 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+from .board import CELLS
+from .densityai import DensityAI
+from .fleetgen import random_layout, layout_fleet
+
+# Headless round-robin tournaments between shooting/placement strategies.
+#
+# A Strategy pairs a placement callable, place(rng) -> layout (see
+# fleetgen), with a shooter factory, shooter(seed) -> an object with
+# choose_cell() -> int and observe(ShotResult), such as DensityAI. Both
+# must be module-level so they can be sent to worker processes.
+#
+# Every game has a seed made from the tournament seed, the pair and the game
+# number, so a run is reproducible whatever the number of workers. Games are
+# run in chunks on a ProcessPoolExecutor and their results are written to
+# disk and folded into the statistics in schedule order as chunks complete,
+# with only a bounded number of chunks in flight.
+
+ELO_START = 1500
+ELO_K = 16
+
+class RandomShooter:
+    # Fires at every cell once, in random order
+    __slots__ = ('_cells',)
+
+    def __init__(self, seed: int = None):
+        self._cells = list(range(CELLS))
+        random.Random(seed).shuffle(self._cells)
+
+    def choose_cell(self) -> int:
+        return self._cells.pop()
+
+    def observe(self, result: 'ShotResult') -> None:
+        pass
+
+class Strategy:
+    __slots__ = ('name', 'place', 'shooter')
+
+    def __init__(self, name: str, place: 'callable' = random_layout, shooter: 'callable' = RandomShooter):
+        self.name = name
+        self.place = place
+        self.shooter = shooter
+
+# Strategies available by name from the command line
+STRATEGIES = {'random': Strategy('random'),
+              'density': Strategy('density', shooter=DensityAI)}
+
+def play_game(first: Strategy, second: Strategy, seed: str) -> (int, int):
+    # Play one game with first shooting first. Returns (winner, shots the
+    # winner fired), winner being 0 for first and 1 for second.
+    from .battleship import ClassicGame
+
+    rng = random.Random(seed)
+    players = [layout_fleet(strategy.place(random.Random(rng.getrandbits(64))), strategy.name)
+               for strategy in (first, second)]
+    shooters = [strategy.shooter(rng.getrandbits(64)) for strategy in (first, second)]
+
+    game = ClassicGame(players[0], players[1])
+    shots = [0, 0]
+    turn = 0
+    while not game.is_over:
+        shooter = shooters[turn]
+        shooter.observe(game.fire_cell(shooter.choose_cell()))
+        shots[turn] += 1
+        turn ^= 1
+
+    winner = 0 if game.winner is players[0] else 1
+    return winner, shots[winner]
+
+def _play_chunk(strategies: [Strategy], pair: (int, int), games: range, seed: int) -> [(int, int, int)]:
+    # (player that went first, winner, shots to win) per game; the pair
+    # swaps who goes first every game
+    i, j = pair
+    results = []
+    for game in games:
+        first, second = (i, j) if game % 2 == 0 else (j, i)
+        winner, shots = play_game(strategies[first], strategies[second],
+                                  '{}:{}:{}:{}'.format(seed, i, j, game))
+        results.append((first, (first, second)[winner], shots))
+    return results
+
+class _Record:
+    __slots__ = ('games', 'wins', 'first_games', 'first_wins', 'shots_to_win', 'elo')
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.first_games = 0
+        self.first_wins = 0
+        # Histogram of the shots taken in won games
+        self.shots_to_win = dict()
+        self.elo = float(ELO_START)
+
+def _wilson(wins: int, games: int, z: float = 1.96) -> (float, float):
+    # Wilson score interval of a win rate
+    if not games:
+        return 0.0, 0.0
+    p = wins / games
+    centre = (p + z * z / (2 * games)) / (1 + z * z / games)
+    spread = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return centre - spread, centre + spread
+
+class TournamentStats:
+    # Running totals, updated one game at a time
+    def __init__(self, names: [str]):
+        self._names = list(names)
+        self._records = [_Record() for _ in self._names]
+        self._pairs = dict()
+
+    def add(self, pair: (int, int), first: int, winner: int, shots: int) -> None:
+        i, j = pair
+        loser = j if winner == i else i
+        for player in pair:
+            record = self._records[player]
+            record.games += 1
+            if player == first:
+                record.first_games += 1
+                if player == winner:
+                    record.first_wins += 1
+
+        record = self._records[winner]
+        record.wins += 1
+        record.shots_to_win[shots] = record.shots_to_win.get(shots, 0) + 1
+
+        pair_wins = self._pairs.setdefault(pair, [0, 0])
+        pair_wins[0 if winner == i else 1] += 1
+
+        winner_record, loser_record = self._records[winner], self._records[loser]
+        expected = 1 / (1 + 10 ** ((loser_record.elo - winner_record.elo) / 400))
+        winner_record.elo += ELO_K * (1 - expected)
+        loser_record.elo -= ELO_K * (1 - expected)
+
+    def summary(self) -> dict:
+        strategies = dict()
+        for name, record in zip(self._names, self._records):
+            count = sum(record.shots_to_win.values())
+            mean = sum(shots * n for shots, n in record.shots_to_win.items()) / count if count else 0.0
+            variance = (sum(n * (shots - mean) ** 2 for shots, n in record.shots_to_win.items()) / (count - 1)
+                        if count > 1 else 0.0)
+            spread = 1.96 * math.sqrt(variance / count) if count else 0.0
+            strategies[name] = {
+                'games': record.games,
+                'wins': record.wins,
+                'win_rate': record.wins / record.games if record.games else 0.0,
+                'win_rate_ci': _wilson(record.wins, record.games),
+                'first_move_win_rate': record.first_wins / record.first_games if record.first_games else 0.0,
+                'shots_to_win_mean': mean,
+                'shots_to_win_ci': (mean - spread, mean + spread),
+                'shots_to_win': {shots: record.shots_to_win[shots] for shots in sorted(record.shots_to_win)},
+                'elo': record.elo
+            }
+
+        pairs = dict()
+        for (i, j), (i_wins, j_wins) in sorted(self._pairs.items()):
+            pairs['{} vs {}'.format(self._names[i], self._names[j])] = {
+                'wins': (i_wins, j_wins),
+                'win_rate_ci': _wilson(i_wins, i_wins + j_wins)
+            }
+
+        return {'strategies': strategies, 'pairs': pairs}
+
+def _schedule(count: int, games_per_pair: int, chunk_size: int) -> '[((int, int), range)]':
+    for i in range(count):
+        for j in range(i + 1, count):
+            for start in range(0, games_per_pair, chunk_size):
+                yield (i, j), range(start, min(start + chunk_size, games_per_pair))
+
+def run_tournament(strategies: [Strategy], games_per_pair: int, seed: int = 0,
+                   out: 'file' = None, workers: int = None, chunk_size: int = 100) -> TournamentStats:
+    # Round robin of games_per_pair games between every pair of strategies.
+    # Each game is written to out as a JSON line when given. workers=0 plays
+    # in this process.
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    stats = TournamentStats(strategy.name for strategy in strategies)
+    names = [strategy.name for strategy in strategies]
+
+    def record(pair: (int, int), games: range, results: [(int, int, int)]) -> None:
+        for game, (first, winner, shots) in zip(games, results):
+            stats.add(pair, first, winner, shots)
+            if out is not None:
+                out.write(json.dumps({'pair': [names[pair[0]], names[pair[1]]], 'game': game,
+                                      'first': names[first], 'winner': names[winner],
+                                      'shots': shots}) + '\n')
+
+    schedule = _schedule(len(strategies), games_per_pair, chunk_size)
+    if workers == 0:
+        for pair, games in schedule:
+            record(pair, games, _play_chunk(strategies, pair, games, seed))
+        return stats
+
+    with ProcessPoolExecutor(workers) as executor:
+        in_flight = deque()
+        limit = 4 * (workers or os.cpu_count() or 1)
+        for pair, games in schedule:
+            in_flight.append((pair, games, executor.submit(_play_chunk, strategies, pair, games, seed)))
+            if len(in_flight) >= limit:
+                pair, games, future = in_flight.popleft()
+                record(pair, games, future.result())
+        while in_flight:
+            pair, games, future = in_flight.popleft()
+            record(pair, games, future.result())
+
+    return stats
+
+def main(argv: [str] = None) -> None:
+    parser = argparse.ArgumentParser(description='Round-robin tournament between strategies')
+    parser.add_argument('strategies', nargs='*', metavar='strategy',
+                        help='two or more of: {} (default all)'.format(', '.join(sorted(STRATEGIES))))
+    parser.add_argument('--games', type=int, default=1000, help='games per pair of strategies')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, 0 to play in process')
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--out', help='file to stream game results to (JSON lines)')
+    args = parser.parse_args(argv)
+
+    names = args.strategies or sorted(STRATEGIES)
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        parser.error('unknown strategy: {}'.format(', '.join(unknown)))
+    strategies = [STRATEGIES[name] for name in names]
+    if args.out:
+        with open(args.out, 'w') as out:
+            stats = run_tournament(strategies, args.games, args.seed, out, args.workers, args.chunk_size)
+    else:
+        stats = run_tournament(strategies, args.games, args.seed, None, args.workers, args.chunk_size)
+
+    json.dump(stats.summary(), sys.stdout, indent=2)
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import random
+import unittest
+
+from pyships.battleship import BACKENDS, ClassicGame, ClassicPlayer
+from pyships.board import CELLS, COLUMNS, ROWS
+from pyships.ships import FLEET
+
+# NumPy is optional, see the ReadMe
+try:
+    import numpy
+    from pyships.batchgame import BatchGame
+except ImportError:
+    numpy = None
+
+def _grid_placed(name: str, backend: str) -> ClassicPlayer:
+    # Player whose ships only the ocean grid knows about, player.ships
+    # stays all None
+    player = ClassicPlayer(name, backend=backend)
+    for row, ship_type in enumerate(FLEET):
+        ship = ship_type()
+        player.ocean_grid.place_cell(row * COLUMNS + row, row * COLUMNS + row + ship.length - 1, ship)
+    return player
+
+@unittest.skipIf(numpy is None, 'needs NumPy')
+class FromGamesTest(unittest.TestCase):
+    def test_grid_placed_players(self):
+        rng = random.Random(0)
+        for backend in BACKENDS:
+            game = ClassicGame(_grid_placed('Player1', backend), _grid_placed('Player2', backend))
+            orders = [rng.sample(range(CELLS), CELLS) for _ in range(2)]
+            for turn in range(40):
+                game.fire_cell(orders[turn % 2][turn // 2])
+
+            batch = BatchGame.from_games([game])
+            expected = numpy.zeros((ROWS, COLUMNS), dtype=numpy.int8)
+            for row, ship_type in enumerate(FLEET):
+                expected[row, row:row + ship_type().length] = row + 1
+            self.assertTrue((batch.ships[0, 0] == expected).all(), backend)
+            self.assertTrue((batch.ships[0, 1] == expected).all(), backend)
+
+            # Both engines agree on the rest of the game
+            for turn in range(40, 2 * CELLS):
+                if game.is_over:
+                    break
+                cell = orders[turn % 2][turn // 2]
+                result = game.fire_cell(cell)
+                batch_result = batch.take_cell_shots(numpy.array([cell]))
+                self.assertEqual(bool(batch_result.hit[0]), result.is_hit, backend)
+                self.assertEqual(bool(batch_result.game_over[0]), result.is_game_over, backend)
+            self.assertTrue(game.is_over and batch.is_over[0], backend)
+
+    def test_incomplete_fleet(self):
+        # ClassicGame checks the fleets when it starts, a ship taken off later
+        # leaves one short
+        player = _grid_placed('Player1', 'list')
+        game = ClassicGame(player, _grid_placed('Player2', 'list'))
+        player.ocean_grid.unplace(player.ocean_grid.ships[0])
+        with self.assertRaises(ValueError):
+            BatchGame.from_games([game])
+
+@unittest.skipIf(numpy is None, 'needs NumPy')
+class ShipIdsTest(unittest.TestCase):
+    def test_ids_past_fleet_size(self):
+        ships = numpy.zeros((1, 2, ROWS, COLUMNS), dtype=numpy.int8)
+        ships[0, 0, 0, :2] = len(FLEET) + 1
+        with self.assertRaises(ValueError):
+            BatchGame(ships)
+
+    def test_ids_past_nibble(self):
+        ships = numpy.zeros((1, 2, ROWS, COLUMNS), dtype=numpy.int16)
+        ships[0, 1, 0, :2] = 8
+        with self.assertRaises(ValueError):
+            BatchGame(ships, fleet_size=7)
+        ships[0, 1, 0, :2] = 0x108
+        with self.assertRaises(ValueError):
+            BatchGame(ships, fleet_size=7)
+
+    def test_negative_ids(self):
+        ships = numpy.zeros((1, 2, ROWS, COLUMNS), dtype=numpy.int8)
+        ships[0, 0, 0, 0] = -1
+        with self.assertRaises(ValueError):
+            BatchGame(ships)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from pyships.battleship import BACKENDS, ClassicGame, ClassicPlayer
+from pyships.board import COLUMNS, Board
+from pyships.errortypes import GameError
+from pyships.fleetgen import generate_fleet
+from pyships.ships import Destroyer, FLEET
+
+def _grid_placed(name: str, backend: str = 'list', fleet: (type,) = FLEET) -> ClassicPlayer:
+    player = ClassicPlayer(name, backend=backend)
+    for row, ship_type in enumerate(fleet):
+        ship = ship_type()
+        player.ocean_grid.place_cell(row * COLUMNS, row * COLUMNS + ship.length - 1, ship)
+    return player
+
+class ClassicGameStartTest(unittest.TestCase):
+    def test_complete_fleets(self):
+        for backend in BACKENDS:
+            ClassicGame(_grid_placed('Player1', backend), generate_fleet(1, 'Player2', backend))
+
+    def test_missing_ship(self):
+        with self.assertRaises(GameError):
+            ClassicGame(_grid_placed('Player1', fleet=FLEET[1:]), _grid_placed('Player2'))
+
+    def test_extra_ship(self):
+        with self.assertRaises(GameError):
+            ClassicGame(_grid_placed('Player1', fleet=FLEET + (Destroyer,)), _grid_placed('Player2'))
+
+    def test_target_grid_with_pegs(self):
+        player = _grid_placed('Player1')
+        player.target_grid.miss_cell(99)
+        with self.assertRaises(GameError):
+            ClassicGame(player, _grid_placed('Player2'))
+
+class FromLayoutTest(unittest.TestCase):
+    def test_non_classic_board(self):
+        for backend in BACKENDS:
+            with self.assertRaises(ValueError):
+                ClassicPlayer.from_layout((0,) * len(FLEET), backend=backend, board=Board(12, 12))
+
+if __name__ == '__main__':
+    unittest.main()
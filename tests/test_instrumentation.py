@@ -0,0 +1,29 @@
+import unittest
+
+from pyships import instrumentation
+from pyships.battleship import OceanGrid, SparseOceanGrid
+from pyships.ships import Destroyer
+
+class EnableTest(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_sparse_grid_has_its_own_label(self):
+        metrics = instrumentation.enable()
+        grid = SparseOceanGrid()
+        grid.place_cell(0, 2, Destroyer())
+        grid.receive_shot_cell(0)
+
+        self.assertEqual(metrics.histogram('pyships_ocean_shot_seconds', 'grid="SparseOceanGrid"').count, 1)
+        self.assertEqual(metrics.histogram('pyships_ocean_shot_seconds', 'grid="OceanGrid"').count, 0)
+        self.assertEqual(metrics.histogram('pyships_ocean_place_seconds', 'grid="SparseOceanGrid"').count, 1)
+
+    def test_disable_restores_methods(self):
+        receive_shot_cell = OceanGrid.receive_shot_cell
+        instrumentation.enable()
+        instrumentation.disable()
+        self.assertIs(OceanGrid.receive_shot_cell, receive_shot_cell)
+        self.assertNotIn('receive_shot_cell', SparseOceanGrid.__dict__)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from pyships.battleship import BACKENDS, ClassicGame, ClassicPlayer
+from pyships.board import Board
+from pyships.gamelog import GameLog, Replay
+from pyships.ships import FLEET
+
+def _placed(name: str, backend: str, board: Board) -> ClassicPlayer:
+    player = ClassicPlayer(name, backend=backend, board=board)
+    for row, ship_type in enumerate(FLEET):
+        ship = ship_type()
+        start = row * board.columns
+        player.ocean_grid.place_cell(start, start + ship.length - 1, ship)
+        player.ships[ship_type.__name__] = ship
+    return player
+
+def _game(backend: str, board: Board, shots: [int], log: GameLog = None) -> ClassicGame:
+    game = ClassicGame(_placed('Player1', backend, board), _placed('Player2', backend, board), board, log)
+    for cell in shots:
+        game.fire_cell(cell)
+    return game
+
+class SnapshotTest(unittest.TestCase):
+    def assertSameGame(self, game, decoded):
+        for player, other in zip(game.players, decoded.players):
+            self.assertEqual(player.ocean_grid.peg_cells(), other.ocean_grid.peg_cells())
+            self.assertEqual(player.target_grid.peg_masks(), other.target_grid.peg_masks())
+            self.assertEqual([type(ship).__name__ for ship in player.target_grid.sunk_ships],
+                             [type(ship).__name__ for ship in other.target_grid.sunk_ships])
+        self.assertIs(decoded.current_player, decoded.players[game.players.index(game.current_player)])
+
+    def test_classic_round_trip(self):
+        # Both players shoot along their first rows, sinking the Carriers
+        shots = [cell for column in range(9) for cell in (column, column)]
+        for backend in BACKENDS:
+            game = _game(backend, Board(10, 10), shots)
+            data = game.to_bytes()
+            self.assertLessEqual(len(data), 77)
+            self.assertSameGame(game, ClassicGame.from_bytes(data, backend=backend))
+
+    def test_sparse_board_writes_cell_lists(self):
+        board = Board(10000, 10000)
+        shots = [cell for shot in range(50) for cell in (shot, board.cells - 1 - shot)]
+        game = _game('sparse', board, shots)
+        data = game.to_bytes()
+        # Bitmaps would take 2 x 12.5 MB per player
+        self.assertLess(len(data), 500)
+        for backend in ('sparse', 'bitboard'):
+            self.assertSameGame(game, ClassicGame.from_bytes(data, backend=backend))
+
+    def test_sink_order(self):
+        # The Patrol Boat (row 4) sinks before the Carrier (row 0), against
+        # the cell order of the pegs. Player2 shoots down the last column.
+        shots = []
+        for cell in (40, 41, 0, 1, 2, 3, 4):
+            shots += [cell, 99 - len(shots) // 2 * 10]
+        for backend in BACKENDS:
+            log = GameLog(keyframe_interval=13)
+            game = _game(backend, Board(10, 10), shots, log)
+            self.assertEqual([type(ship).__name__ for ship in game.players[0].target_grid.sunk_ships],
+                             ['PatrolBoat', 'Carrier'])
+            self.assertSameGame(game, ClassicGame.from_bytes(game.to_bytes(), backend=backend))
+            self.assertSameGame(game, Replay(log, backend).state_at(len(shots)))
+
+    def test_reads_version_1(self):
+        # Enough misses below the ships for bitmaps, the only version 1 pegs
+        game = _game('list', Board(10, 10), [cell for cell in range(50, 75) for _ in range(2)])
+        data = bytearray(game.to_bytes())
+        self.assertEqual(len(data), 68)
+        # Drop the empty sunk lists after each player's pegs
+        del data[67], data[35]
+        data[2] = 1
+        self.assertSameGame(game, ClassicGame.from_bytes(bytes(data)))
+
+if __name__ == '__main__':
+    unittest.main()